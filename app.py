@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime
-import io
+import tempfile
+import uuid
 
 from utils.file_handler import parse_csv, parse_pdf
-from utils.data_processor import categorize_transactions, calculate_summary
-from utils.tax_calculator import calculate_tax_liability
+from utils.data_processor import categorize_transactions, categorization_inputs, calculate_summary
+from utils.tax_calculator import brackets_key, calculate_tax_liability, calculate_tax_liabilities
 from utils.visualization import (
     plot_income_vs_expense,
     plot_expense_categories,
@@ -26,6 +28,27 @@ st.set_page_config(
 if 'transactions' not in st.session_state:
     st.session_state.transactions = pd.DataFrame()
 
+# Version key for the transactions frame, used to key cached views of it
+if 'transactions_key' not in st.session_state:
+    st.session_state.transactions_key = uuid.uuid4().hex
+
+# Keys of every imported transaction, used to skip duplicates on import
+if 'transaction_keys' not in st.session_state:
+    st.session_state.transaction_keys = set()
+
+# Date range covered by the transactions, kept up to date by set_transactions
+if 'date_min' not in st.session_state:
+    st.session_state.date_min = None
+    st.session_state.date_max = None
+
+# Date-filtered views of the current transactions frame, cleared by set_transactions
+if 'filtered_transactions' not in st.session_state:
+    st.session_state.filtered_transactions = {}
+
+# Expense totals per date and category, kept up to date by set_transactions
+if 'daily_expenses' not in st.session_state:
+    st.session_state.daily_expenses = None
+
 # Track imported statements for management
 if 'imported_statements' not in st.session_state:
     st.session_state.imported_statements = []
@@ -66,6 +89,149 @@ def reset_file_uploader():
     st.session_state.file_processed = False
     st.session_state.statement_uploader = None
 
+# Hash each transaction's date, description and amount into a 64-bit duplicate-detection key
+def transaction_keys(df):
+    return pd.util.hash_pandas_object(df[['date', 'description', 'amount']], index=False).to_numpy()
+
+# Mask the rows in a category by comparing the integer category codes rather than the labels
+def category_mask(df, category):
+    categories = df['category'].cat.categories
+    if category not in categories:
+        return np.zeros(len(df), dtype=bool)
+    return df['category'].cat.codes.to_numpy() == categories.get_loc(category)
+
+# Store a new transactions frame and invalidate any cached views of the old one
+def set_transactions(df):
+    if not df.empty:
+        # Rows whose date failed to parse can't be placed in any date range, and as
+        # NaT would sort last and become the start of the date range
+        if df['date'].isna().any():
+            df = df[df['date'].notna()]
+        # Categorical dtype turns category comparisons and groupbys into integer-code operations
+        categorical_columns = {
+            col: 'category' for col in ['category', 'subcategory', 'statement_id', 'description']
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+        }
+        if categorical_columns:
+            df = df.astype(categorical_columns)
+        # The description categories list the distinct descriptions, so drop any left
+        # behind by removed transactions
+        if 'description' not in categorical_columns:
+            df = df.assign(description=df['description'].cat.remove_unused_categories())
+        # Format display dates once per transaction rather than on every table render
+        if 'date_str' not in df.columns or df['date_str'].isna().any():
+            df = df.assign(date_str=df['date'].dt.strftime('%d/%m/%Y'))
+        # Keep the remaining text columns as Arrow-backed strings rather than Python objects
+        string_columns = {col: 'string[pyarrow]' for col in df.columns if df[col].dtype == object}
+        if string_columns:
+            df = df.astype(string_columns)
+    st.session_state.transactions = df
+    st.session_state.transactions_key = uuid.uuid4().hex
+    st.session_state.filtered_transactions = {}
+    # Transactions are kept sorted newest first, so the date range is at the ends
+    if df.empty:
+        st.session_state.date_min = None
+        st.session_state.date_max = None
+        st.session_state.daily_expenses = None
+    else:
+        st.session_state.date_min = df['date'].iloc[-1].date()
+        st.session_state.date_max = df['date'].iloc[0].date()
+        # Bucket expenses by date and category once, so monthly trends regroup
+        # the buckets in a date range instead of every transaction
+        expenses = df[~category_mask(df, 'Income')]
+        st.session_state.daily_expenses = expenses.groupby(['date', 'category'], observed=True)['amount'].sum()
+
+# Most date-filtered views kept per transactions frame, and most entries kept by each cached
+# helper, since every new transactions version orphans the entries keyed on the old one
+FILTERED_TRANSACTIONS_MAX_ENTRIES = 16
+CACHE_MAX_ENTRIES = 32
+
+def get_filtered_transactions(transactions, transactions_key, start_date, end_date, expenses_only=False):
+    """
+    Filter transactions to a date range, memoized in session state per transactions version
+    and range so repeated reruns return the same frame without copying or unpickling it.
+    
+    Args:
+        transactions: DataFrame containing all transactions
+        transactions_key: Version key identifying the transactions frame
+        start_date: First date to include
+        end_date: Last date to include
+        expenses_only: Whether to exclude income transactions
+    
+    Returns:
+        Filtered DataFrame
+    """
+    cache = st.session_state.filtered_transactions
+    key = (transactions_key, start_date, end_date, expenses_only)
+    if key in cache:
+        return cache[key]
+    
+    # Transactions are kept sorted newest first, so the date range is a
+    # contiguous block that can be located by binary search on the reversed dates
+    dates = transactions['date'].to_numpy()[::-1]
+    start, end = np.datetime64(pd.Timestamp(start_date)), np.datetime64(pd.Timestamp(end_date))
+    if len(dates) and start <= dates[0] and dates[-1] <= end:
+        # The range covers every transaction, which is the default on every page
+        filtered_data = transactions
+    else:
+        lo = len(dates) - np.searchsorted(dates, end, side='right')
+        hi = len(dates) - np.searchsorted(dates, start, side='left')
+        filtered_data = transactions.iloc[lo:hi]
+    
+    if expenses_only:
+        filtered_data = filtered_data[~category_mask(filtered_data, 'Income')]
+    
+    # Evict the oldest view once the memo is full
+    if len(cache) >= FILTERED_TRANSACTIONS_MAX_ENTRIES:
+        del cache[next(iter(cache))]
+    cache[key] = filtered_data
+    return filtered_data
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def get_summary(_transactions, transactions_key, start_date, end_date, expenses_only=False):
+    """
+    Calculate summary statistics for a date range, cached like get_filtered_transactions.
+    """
+    filtered_data = get_filtered_transactions(_transactions, transactions_key, start_date, end_date, expenses_only)
+    return calculate_summary(filtered_data)
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def get_tax_liability(income_cents, brackets_key):
+    """
+    Calculate tax liability, cached on the income in whole cents and the brackets.
+    
+    Args:
+        income_cents: Annual income rounded to whole cents
+        brackets_key: Tuple of (min, max, rate) tuples describing the tax brackets
+    
+    Returns:
+        Dictionary with tax liability information
+    """
+    tax_brackets = [{'min': min_amount, 'max': max_amount, 'rate': rate} for min_amount, max_amount, rate in brackets_key]
+    return calculate_tax_liability(income_cents / 100, tax_brackets)
+
+# Chart builders that depend only on the filtered transactions
+CHART_BUILDERS = {
+    'income_vs_expense': plot_income_vs_expense,
+    'expense_categories': plot_expense_categories,
+    'monthly_trend': plot_monthly_trend
+}
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def get_chart(chart, _transactions, transactions_key, start_date, end_date, expenses_only=False):
+    """
+    Build a transactions chart for a date range, cached like get_filtered_transactions.
+    """
+    filtered_data = get_filtered_transactions(_transactions, transactions_key, start_date, end_date, expenses_only)
+    return CHART_BUILDERS[chart](filtered_data)
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def get_tax_breakdown_chart(tax_info):
+    """
+    Build the tax breakdown chart, cached on the tax liability figures.
+    """
+    return plot_tax_breakdown(tax_info)
+
 # Sidebar for navigation and file upload
 with st.sidebar:
     st.title("Personal Finance Tracker")
@@ -124,7 +290,7 @@ with st.sidebar:
                         max_date = new_data['date'].max().date() if not new_data.empty else None
                         
                         # Create a unique identifier for this statement
-                        statement_id = f"{uploaded_file.name}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                        statement_id = uuid.uuid4().hex
                         
                         # Add a statement_id column to identify which transactions belong to which statement
                         new_data['statement_id'] = statement_id
@@ -144,25 +310,36 @@ with st.sidebar:
                         st.session_state.imported_statements.append(statement_info)
                         
                         # Combine with new data
+                        new_keys = transaction_keys(new_data)
                         if not current_data.empty:
                             # If existing data doesn't have a statement_id, add a default one
                             if 'statement_id' not in current_data.columns:
                                 current_data['statement_id'] = 'original_data'
                                 
-                            combined_data = pd.concat([current_data, new_data], ignore_index=True)
-                            # Remove duplicates based on date and amount
-                            combined_data = combined_data.drop_duplicates(subset=['date', 'description', 'amount'], keep='first')
+                            # Skip transactions that were already imported, matched on date, description and amount,
+                            # looking them up in the stored key set so the existing data is not re-hashed
+                            seen_keys = st.session_state.transaction_keys
+                            is_new = np.array([key not in seen_keys for key in new_keys.tolist()], dtype=bool)
+                            is_new &= ~pd.Series(new_keys).duplicated().to_numpy()
+                            
+                            if is_new.any():
+                                combined_data = pd.concat([current_data, new_data[is_new]], ignore_index=True)
+                            else:
+                                # Nothing new to add, so relabel the existing rows as concat would instead of copying them
+                                combined_data = current_data.set_axis(pd.RangeIndex(len(current_data)), copy=False)
                         else:
                             combined_data = new_data
+                        st.session_state.transaction_keys.update(new_keys.tolist())
                         
-                        # Ensure the date is in datetime format
-                        combined_data['date'] = pd.to_datetime(combined_data['date'])
+                        # Ensure the date is in datetime format (the parsers normally produce one already)
+                        if not pd.api.types.is_datetime64_any_dtype(combined_data['date']):
+                            combined_data['date'] = pd.to_datetime(combined_data['date'], cache=True)
                         
                         # Sort by date
                         combined_data = combined_data.sort_values('date', ascending=False)
                         
                         # Update the categorized data
-                        st.session_state.transactions = categorize_transactions(combined_data, st.session_state.categories)
+                        set_transactions(categorize_transactions(combined_data, st.session_state.categories))
                         
                         st.success(f"Successfully imported {len(new_data)} transactions!")
                         
@@ -196,8 +373,8 @@ if page == "Dashboard":
         col1, col2 = st.columns(2)
         
         # Get min and max dates from the data
-        min_date = st.session_state.transactions['date'].min().date()
-        max_date = st.session_state.transactions['date'].max().date()
+        min_date = st.session_state.date_min
+        max_date = st.session_state.date_max
         
         with col1:
             start_date = st.date_input("Start Date", min_date)
@@ -205,13 +382,14 @@ if page == "Dashboard":
             end_date = st.date_input("End Date", max_date)
         
         # Filter data by date
-        filtered_data = st.session_state.transactions[
-            (st.session_state.transactions['date'] >= pd.Timestamp(start_date)) & 
-            (st.session_state.transactions['date'] <= pd.Timestamp(end_date))
-        ]
+        filtered_data = get_filtered_transactions(
+            st.session_state.transactions, st.session_state.transactions_key, start_date, end_date
+        )
         
         # Calculate summary statistics
-        summary = calculate_summary(filtered_data)
+        summary = get_summary(
+            st.session_state.transactions, st.session_state.transactions_key, start_date, end_date
+        )
         
         # Display summary metrics
         st.subheader("Financial Summary")
@@ -222,8 +400,9 @@ if page == "Dashboard":
         col4.metric("Savings Rate", f"{summary['savings_rate']:.1f}%")
         
         # Tax liability calculation
-        annual_income = summary['total_income'] * (365 / (end_date - start_date).days) if (end_date - start_date).days > 0 else 0
-        tax_info = calculate_tax_liability(annual_income, st.session_state.tax_brackets)
+        days_in_range = (end_date - start_date).days
+        annual_income = summary['total_income'] * 365 / days_in_range if days_in_range > 0 else 0
+        tax_info = get_tax_liability(round(annual_income * 100), brackets_key(st.session_state.tax_brackets))
         
         st.subheader("Estimated Tax Liability")
         col1, col2, col3 = st.columns(3)
@@ -238,16 +417,22 @@ if page == "Dashboard":
         tab1, tab2, tab3, tab4, tab5 = st.tabs(["Income vs Expenses", "Expense Categories", "Monthly Trend", "Tax Breakdown", "Transaction Lists"])
         
         with tab1:
-            st.plotly_chart(plot_income_vs_expense(filtered_data), use_container_width=True)
+            st.plotly_chart(get_chart(
+                'income_vs_expense', st.session_state.transactions, st.session_state.transactions_key, start_date, end_date
+            ), use_container_width=True)
         
         with tab2:
-            st.plotly_chart(plot_expense_categories(filtered_data), use_container_width=True)
+            st.plotly_chart(get_chart(
+                'expense_categories', st.session_state.transactions, st.session_state.transactions_key, start_date, end_date
+            ), use_container_width=True)
         
         with tab3:
-            st.plotly_chart(plot_monthly_trend(filtered_data), use_container_width=True)
+            st.plotly_chart(get_chart(
+                'monthly_trend', st.session_state.transactions, st.session_state.transactions_key, start_date, end_date
+            ), use_container_width=True)
             
         with tab4:
-            st.plotly_chart(plot_tax_breakdown(tax_info), use_container_width=True)
+            st.plotly_chart(get_tax_breakdown_chart(tax_info), use_container_width=True)
             
         with tab5:
             # Transaction lists section
@@ -263,15 +448,15 @@ if page == "Dashboard":
                     # Create a DataFrame for display
                     income_df = pd.DataFrame(income_transactions)
                     
-                    # Format the date to dd/mm/yyyy
-                    income_df['date'] = pd.to_datetime(income_df['date']).dt.strftime('%d/%m/%Y')
+                    # Show the precomputed dd/mm/yyyy date in place of the ISO date
+                    income_df = income_df.drop(columns='date')
                     
                     # Format the amount column
-                    income_df['amount'] = income_df['amount'].apply(lambda x: f"${x:.2f}")
+                    income_df['amount'] = income_df['amount'].map('${:.2f}'.format)
                     
                     # Rename columns for display
                     income_df = income_df.rename(columns={
-                        'date': 'Date',
+                        'date_str': 'Date',
                         'description': 'Description',
                         'amount': 'Amount',
                         'subcategory': 'Subcategory'
@@ -292,15 +477,15 @@ if page == "Dashboard":
                     # Create a DataFrame for display
                     expense_df = pd.DataFrame(expense_transactions)
                     
-                    # Format the date to dd/mm/yyyy
-                    expense_df['date'] = pd.to_datetime(expense_df['date']).dt.strftime('%d/%m/%Y')
+                    # Show the precomputed dd/mm/yyyy date in place of the ISO date
+                    expense_df = expense_df.drop(columns='date')
                     
                     # Format the amount column
-                    expense_df['amount'] = expense_df['amount'].apply(lambda x: f"${x:.2f}")
+                    expense_df['amount'] = expense_df['amount'].map('${:.2f}'.format)
                     
                     # Rename columns for display
                     expense_df = expense_df.rename(columns={
-                        'date': 'Date',
+                        'date_str': 'Date',
                         'description': 'Description',
                         'amount': 'Amount',
                         'category': 'Category',
@@ -333,47 +518,47 @@ if page == "Dashboard":
             else:
                 st.info("No transactions found in the selected date range.")
         
-        # Recent transactions with category filtering
-        st.subheader("Recent Transactions")
+        # Recent transactions with category filtering, run as a fragment so that
+        # changing the category filter only reruns this section
+        @st.fragment
+        def show_recent_transactions(filtered_data):
+            st.subheader("Recent Transactions")
         
-        # Create category filter
-        all_categories = ['All Categories'] + list(st.session_state.categories.keys())
-        selected_category = st.selectbox("Filter by category", all_categories, key="recent_tx_category")
+            # Create category filter
+            all_categories = ['All Categories'] + list(st.session_state.categories.keys())
+            selected_category = st.selectbox("Filter by category", all_categories, key="recent_tx_category")
         
-        # Apply category filter if not "All Categories"
-        if selected_category != 'All Categories':
-            display_data = filtered_data[filtered_data['category'] == selected_category].copy()
-        else:
-            display_data = filtered_data.copy()
-            
-        # Format the data for cleaner display
-        if not display_data.empty:
-            # Format the date to dd/mm/yyyy
-            display_data['date'] = display_data['date'].dt.strftime('%d/%m/%Y')
-            
-            # Format the amount with currency symbol and proper sign
-            display_data['amount'] = display_data.apply(
-                lambda row: f"${abs(row['amount']):.2f}" if row['category'] != 'Income' 
-                else f"${row['amount']:.2f}", axis=1
-            )
+            # Apply category filter if not "All Categories"
+            # Only the most recent 100 transactions are displayed to avoid overwhelming the UI,
+            # so take them before formatting rather than formatting the whole range
+            if selected_category != 'All Categories':
+                recent_data = filtered_data[filtered_data['category'] == selected_category].head(100)
+            else:
+                recent_data = filtered_data.head(100)
             
-            # Rename columns for better display
-            display_columns = {
-                'date': 'Date',
-                'description': 'Description',
-                'amount': 'Amount',
-                'category': 'Category',
-                'subcategory': 'Subcategory'
-            }
+            # Format the data for cleaner display
+            if not recent_data.empty:
+                # Build the display table from the formatted columns rather than
+                # copying the transactions and overwriting them in place
+                amounts = recent_data['amount'].to_numpy()
+                display_data = pd.DataFrame({
+                    # Dates are preformatted as dd/mm/yyyy by set_transactions
+                    'Date': recent_data['date_str'],
+                    'Description': recent_data['description'],
+                    # Format the amount with currency symbol and proper sign
+                    'Amount': pd.Series(
+                        np.where(category_mask(recent_data, 'Income'), amounts, np.abs(amounts)),
+                        index=recent_data.index
+                    ).map('${:.2f}'.format),
+                    'Category': recent_data['category'],
+                    'Subcategory': recent_data['subcategory']
+                })
             
-            # Display only the most recent 100 transactions to avoid overwhelming the UI
-            st.dataframe(
-                display_data.head(100).rename(columns=display_columns)[list(display_columns.values())],
-                use_container_width=True,
-                height=400
-            )
-        else:
-            st.info(f"No transactions found for the selected category and date range.")
+                st.dataframe(display_data, use_container_width=True, height=400)
+            else:
+                st.info(f"No transactions found for the selected category and date range.")
+        
+        show_recent_transactions(filtered_data)
 
 elif page == "Expense Analysis":
     st.title("Expense Analysis")
@@ -386,8 +571,8 @@ elif page == "Expense Analysis":
         col1, col2 = st.columns(2)
         
         # Get min and max dates from the data
-        min_date = st.session_state.transactions['date'].min().date()
-        max_date = st.session_state.transactions['date'].max().date()
+        min_date = st.session_state.date_min
+        max_date = st.session_state.date_max
         
         with col1:
             start_date = st.date_input("Start Date", min_date, key="exp_start_date")
@@ -395,14 +580,16 @@ elif page == "Expense Analysis":
             end_date = st.date_input("End Date", max_date, key="exp_end_date")
         
         # Filter data by date and category (expenses only)
-        filtered_data = st.session_state.transactions[
-            (st.session_state.transactions['date'] >= pd.Timestamp(start_date)) & 
-            (st.session_state.transactions['date'] <= pd.Timestamp(end_date)) &
-            (st.session_state.transactions['category'] != 'Income')  # Only show expenses
-        ]
+        filtered_data = get_filtered_transactions(
+            st.session_state.transactions, st.session_state.transactions_key, start_date, end_date,
+            expenses_only=True
+        )
         
         # Calculate summary statistics for expenses only
-        summary = calculate_summary(filtered_data)
+        summary = get_summary(
+            st.session_state.transactions, st.session_state.transactions_key, start_date, end_date,
+            expenses_only=True
+        )
         
         # Display summary metrics
         st.subheader("Expense Summary")
@@ -412,7 +599,10 @@ elif page == "Expense Analysis":
         
         # Show expense category breakdown as a pie chart
         st.subheader("Expense Categories")
-        expense_chart = plot_expense_categories(filtered_data)
+        expense_chart = get_chart(
+            'expense_categories', st.session_state.transactions, st.session_state.transactions_key, start_date, end_date,
+            expenses_only=True
+        )
         st.plotly_chart(expense_chart, use_container_width=True)
         
         # Show detailed breakdown by category
@@ -427,129 +617,137 @@ elif page == "Expense Analysis":
             })
             # Sort by amount
             expense_df = expense_df.sort_values('Amount', ascending=False)
-            # Format amount
-            expense_df['Amount'] = expense_df['Amount'].apply(lambda x: f"${x:.2f}")
-            # Calculate percentage
+            # Calculate percentage from the cent-rounded amounts before they are formatted
             total_expenses = summary['total_expenses']
-            expense_df['Percentage'] = expense_df['Amount'].apply(
-                lambda x: f"{float(x.replace('$', '')) / total_expenses * 100:.1f}%" if total_expenses > 0 else "0.0%"
-            )
+            if total_expenses > 0:
+                expense_df['Percentage'] = (expense_df['Amount'].round(2) / total_expenses * 100).map('{:.1f}%'.format)
+            else:
+                expense_df['Percentage'] = "0.0%"
+            # Format amount
+            expense_df['Amount'] = expense_df['Amount'].map('${:.2f}'.format)
             
             st.dataframe(expense_df, use_container_width=True)
         else:
             st.info("No expense data available for the selected period.")
         
-        # Let user drill down into specific categories
-        st.subheader("Category Drill-Down")
+        # Let user drill down into specific categories, run as a fragment so that
+        # changing the selected category only reruns this section
+        @st.fragment
+        def show_category_drill_down(filtered_data):
+            st.subheader("Category Drill-Down")
         
-        # Get all expense categories
-        expense_categories = [cat for cat in st.session_state.categories.keys() if cat != 'Income']
+            # Get all expense categories
+            expense_categories = [cat for cat in st.session_state.categories.keys() if cat != 'Income']
         
-        if expense_categories:
-            selected_category = st.selectbox("Select a category to analyze", expense_categories)
+            if expense_categories:
+                selected_category = st.selectbox("Select a category to analyze", expense_categories)
             
-            if selected_category:
-                # Filter transactions for just this category
-                category_data = filtered_data[filtered_data['category'] == selected_category]
+                if selected_category:
+                    # Filter transactions for just this category
+                    category_data = filtered_data[filtered_data['category'] == selected_category]
                 
-                if not category_data.empty:
-                    st.write(f"**{selected_category}** expenses: **${category_data['amount'].abs().sum():.2f}**")
+                    if not category_data.empty:
+                        # Group by subcategory once; both the category total and the
+                        # subcategory breakdown are read from the grouped sums
+                        amounts = category_data['amount']
+                        subcat_totals = pd.DataFrame({
+                            'amount': amounts,
+                            'abs_amount': amounts.abs()
+                        }).groupby(category_data['subcategory'], observed=True, dropna=False).sum()
+                    
+                        st.write(f"**{selected_category}** expenses: **${subcat_totals['abs_amount'].sum():.2f}**")
+                    
+                        # Transactions without a subcategory count towards the total but are not listed
+                        subcat_summary = subcat_totals.loc[subcat_totals.index.notna(), 'amount'].abs()
                     
-                    # Group by subcategory if available
-                    if 'subcategory' in category_data.columns:
-                        subcat_summary = category_data.groupby('subcategory')['amount'].sum().abs()
-                        
                         # Create a DataFrame for display
                         subcat_df = pd.DataFrame({
                             'Subcategory': subcat_summary.index,
                             'Amount': subcat_summary.values
                         })
-                        
+                    
                         # Sort by amount
                         subcat_df = subcat_df.sort_values('Amount', ascending=False)
-                        
+                    
                         # Format amount
-                        subcat_df['Amount'] = subcat_df['Amount'].apply(lambda x: f"${x:.2f}")
-                        
+                        subcat_df['Amount'] = subcat_df['Amount'].map('${:.2f}'.format)
+                    
                         # Display subcategory breakdown
                         st.subheader(f"{selected_category} Subcategories")
                         st.dataframe(subcat_df, use_container_width=True)
                     
-                    # Show transactions for this category
-                    st.subheader(f"{selected_category} Transactions")
+                        # Show transactions for this category
+                        st.subheader(f"{selected_category} Transactions")
                     
-                    # Sort by amount and date
-                    display_data = category_data.sort_values(['amount', 'date'])
+                        # Sort by amount and date
+                        display_data = category_data.sort_values(['amount', 'date'])
                     
-                    # Only show essential columns in a cleaner format
-                    display_cols = ['date', 'description', 'amount', 'subcategory']
-                    if display_data[display_cols].shape[0] > 0:
-                        # Format date and amount
-                        display_data = display_data.copy()
-                        # Format date as dd/mm/yyyy
-                        display_data['date'] = display_data['date'].dt.strftime('%d/%m/%Y')
-                        display_data['amount'] = display_data['amount'].abs().apply(lambda x: f"${x:.2f}")
+                        # Only show essential columns in a cleaner format
+                        # Dates are preformatted as dd/mm/yyyy by set_transactions
+                        display_cols = ['date_str', 'description', 'amount', 'subcategory']
+                        if display_data.shape[0] > 0:
+                            # Format amount on the displayed columns only
+                            display_data = display_data[display_cols].copy()
+                            display_data['amount'] = display_data['amount'].abs().map('${:.2f}'.format)
                         
-                        # Rename columns for better display
-                        display_columns = {
-                            'date': 'Date',
-                            'description': 'Description',
-                            'amount': 'Amount',
-                            'subcategory': 'Subcategory'
-                        }
+                            # Rename columns for better display
+                            display_columns = {
+                                'date_str': 'Date',
+                                'description': 'Description',
+                                'amount': 'Amount',
+                                'subcategory': 'Subcategory'
+                            }
                         
-                        # Display with improved formatting
-                        st.dataframe(
-                            display_data[display_cols].rename(columns=display_columns),
-                            use_container_width=True,
-                            height=350
-                        )
+                            # Display with improved formatting
+                            st.dataframe(
+                                display_data.rename(columns=display_columns),
+                                use_container_width=True,
+                                height=350
+                            )
+                        else:
+                            st.info(f"No transactions found for {selected_category} in the selected date range.")
                     else:
                         st.info(f"No transactions found for {selected_category} in the selected date range.")
-                else:
-                    st.info(f"No transactions found for {selected_category} in the selected date range.")
-        else:
-            st.info("No expense categories defined.")
+            else:
+                st.info("No expense categories defined.")
+        
+        show_category_drill_down(filtered_data)
         
         # Monthly trends for this category
         st.subheader("Monthly Expense Trends")
         
         if not filtered_data.empty:
-            # Group by month and category
-            filtered_data['month'] = filtered_data['date'].dt.to_period('M')
-            monthly_by_category = filtered_data.groupby(['month', 'category'])['amount'].sum().abs().reset_index()
+            # Regroup the per-date expense buckets in the date range by month and category,
+            # one column per category with missing months as zero
+            daily_expenses = st.session_state.daily_expenses.loc[pd.Timestamp(start_date):pd.Timestamp(end_date)]
+            dates = daily_expenses.index.get_level_values('date')
+            monthly_by_category = (
+                daily_expenses.groupby(
+                    [dates.to_period('M').rename('month'), daily_expenses.index.get_level_values('category')],
+                    observed=True
+                ).sum().abs()
+                .unstack(fill_value=0)
+            )
             
             # Convert period to string for proper display
-            monthly_by_category['month'] = monthly_by_category['month'].astype(str)
-            
-            # Create a pivot table for visualization
-            pivot_data = monthly_by_category.pivot(index='month', columns='category', values='amount').fillna(0)
-            
-            # Convert to DataFrame if it's a Series
-            if isinstance(pivot_data, pd.Series):
-                pivot_data = pivot_data.to_frame()
-            
-            # Plot the monthly trends by category
-            import plotly.graph_objects as go
-            
-            fig = go.Figure()
+            monthly_by_category.index = monthly_by_category.index.astype(str)
             
-            for category in pivot_data.columns:
-                fig.add_trace(go.Scatter(
-                    x=pivot_data.index,
-                    y=pivot_data[category],
-                    mode='lines+markers',
-                    name=category
-                ))
+            # Plot the monthly trends by category, one line per column
+            import plotly.express as px
             
-            fig.update_layout(
+            fig = px.line(
+                monthly_by_category,
+                markers=True,
                 title='Monthly Expenses by Category',
-                xaxis_title='Month',
-                yaxis_title='Amount ($)',
                 template='plotly_white',
                 height=500
             )
             
+            fig.update_layout(
+                xaxis_title='Month',
+                yaxis_title='Amount ($)'
+            )
+            
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No expense data available for the selected period.")
@@ -585,10 +783,11 @@ elif page == "Import Data":
     """)
     
     # Show currently imported data
-    if not st.session_state.transactions.empty:
+    transactions = st.session_state.transactions
+    if not transactions.empty:
         st.subheader("Current Dataset")
-        st.write(f"Total transactions: {len(st.session_state.transactions)}")
-        st.write(f"Date range: {st.session_state.transactions['date'].min().date()} to {st.session_state.transactions['date'].max().date()}")
+        st.write(f"Total transactions: {len(transactions)}")
+        st.write(f"Date range: {st.session_state.date_min} to {st.session_state.date_max}")
         
         # Display imported statements with option to remove
         if st.session_state.imported_statements:
@@ -603,15 +802,17 @@ elif page == "Import Data":
                     # Button to remove this statement
                     if st.button(f"Remove this statement", key=f"remove_stmt_{i}"):
                         # Filter out transactions with this statement_id
-                        if 'statement_id' in st.session_state.transactions.columns:
+                        if 'statement_id' in transactions.columns:
                             statement_id = statement['id']
+                            remove_mask = transactions['statement_id'] == statement_id
                             # Check how many transactions will be removed
-                            count_to_remove = sum(st.session_state.transactions['statement_id'] == statement_id)
+                            count_to_remove = remove_mask.sum()
                             
-                            # Remove the transactions
-                            st.session_state.transactions = st.session_state.transactions[
-                                st.session_state.transactions['statement_id'] != statement_id
-                            ]
+                            # Remove the transactions, and their keys so they can be imported again
+                            st.session_state.transaction_keys.difference_update(
+                                transaction_keys(transactions[remove_mask]).tolist()
+                            )
+                            set_transactions(transactions[~remove_mask])
                             
                             # Remove the statement from the imported_statements list
                             st.session_state.imported_statements.remove(statement)
@@ -624,7 +825,8 @@ elif page == "Import Data":
         # Option to clear all data
         if st.button("Clear All Data"):
             # Clear transactions dataframe
-            st.session_state.transactions = pd.DataFrame()
+            set_transactions(pd.DataFrame())
+            st.session_state.transaction_keys = set()
             # Clear imported statements list
             st.session_state.imported_statements = []
             # Display success message
@@ -644,39 +846,30 @@ elif page == "Categories":
     # Display and edit categories
     st.subheader("Edit Categories")
     
-    # Make a copy of the categories
-    edited_categories = st.session_state.categories.copy()
+    def save_categories(new_categories):
+        # Re-categorize all transactions only if the changes can affect how they are categorized
+        recategorize = categorization_inputs(new_categories) != categorization_inputs(st.session_state.categories)
+        st.session_state.categories = new_categories
+        if recategorize and not st.session_state.transactions.empty:
+            set_transactions(categorize_transactions(
+                st.session_state.transactions, st.session_state.categories
+            ))
     
-    # Create expandable sections for each main category
-    for category in list(edited_categories.keys()):
+    # Create expandable sections for each main category; edits live in the widget state
+    # and are only collected into a new categories dict when they are saved
+    for category, subcats in list(st.session_state.categories.items()):
         with st.expander(f"Category: {category}"):
             # Option to rename the category
-            new_category_name = st.text_input(f"Rename '{category}'", category, key=f"rename_{category}")
+            st.text_input(f"Rename '{category}'", category, key=f"rename_{category}")
             
             # Edit subcategories as a comma-separated string
-            subcats_str = ", ".join(edited_categories[category])
-            new_subcats_str = st.text_input(f"Subcategories (comma-separated)", subcats_str, key=f"subcats_{category}")
-            new_subcats = [s.strip() for s in new_subcats_str.split(",") if s.strip()]
-            
-            # Handle category renaming and subcategory updates
-            if new_category_name != category:
-                # Add the new category with the existing subcategories
-                edited_categories[new_category_name] = edited_categories[category]
-                # Remove the old category
-                del edited_categories[category]
-            
-            # Update subcategories
-            if category in edited_categories:  # Check if this category still exists
-                edited_categories[category] = new_subcats
-            else:
-                edited_categories[new_category_name] = new_subcats
+            st.text_input(f"Subcategories (comma-separated)", ", ".join(subcats), key=f"subcats_{category}")
             
             # Option to delete this category
             if st.button(f"Delete Category: {category}", key=f"delete_{category}"):
-                if category in edited_categories:
-                    del edited_categories[category]
-                else:  # If it was renamed
-                    del edited_categories[new_category_name]
+                save_categories({cat: cat_subcats for cat, cat_subcats in st.session_state.categories.items()
+                                 if cat != category})
+                st.rerun()
     
     # Add new category
     st.subheader("Add New Category")
@@ -687,17 +880,20 @@ elif page == "Categories":
         new_subcats = st.text_input("Subcategories (comma-separated)")
     
     if st.button("Add Category") and new_cat:
-        edited_categories[new_cat] = [s.strip() for s in new_subcats.split(",") if s.strip()]
+        save_categories({**st.session_state.categories,
+                         new_cat: [s.strip() for s in new_subcats.split(",") if s.strip()]})
         st.success(f"Added new category: {new_cat}")
     
     # Save changes
     if st.button("Save Category Changes"):
-        st.session_state.categories = edited_categories
-        # Re-categorize all transactions with the updated categories
-        if not st.session_state.transactions.empty:
-            st.session_state.transactions = categorize_transactions(
-                st.session_state.transactions, st.session_state.categories
+        # Only re-parse the subcategory lists that were actually edited
+        save_categories({
+            st.session_state[f"rename_{cat}"]: (
+                subcats if st.session_state[f"subcats_{cat}"] == ", ".join(subcats)
+                else [s.strip() for s in st.session_state[f"subcats_{cat}"].split(",") if s.strip()]
             )
+            for cat, subcats in st.session_state.categories.items()
+        })
         st.success("Categories updated successfully!")
     
     # Display current category mappings
@@ -710,17 +906,29 @@ elif page == "Categories":
         st.subheader("Recategorize Transactions")
         st.write("Select transactions to manually recategorize them:")
         
-        # Get unique descriptions
-        unique_descriptions = st.session_state.transactions['description'].unique()
+        transactions = st.session_state.transactions
+        
+        # The description categories are the unique descriptions, so no scan is needed
+        unique_descriptions = transactions['description'].cat.categories
+        
+        # Narrow the descriptions with a search box and cap the options sent to the selectbox
+        description_query = st.text_input("Filter descriptions", key="recategorize_filter").lower()
+        if description_query:
+            matching_descriptions = unique_descriptions[unique_descriptions.str.lower().str.contains(description_query, regex=False)]
+        else:
+            matching_descriptions = unique_descriptions
+        if len(matching_descriptions) > 200:
+            st.caption(f"Showing the first 200 of {len(matching_descriptions)} descriptions. Type to narrow the list.")
         
         # Let user select a transaction description
-        selected_desc = st.selectbox("Select transaction description", unique_descriptions)
+        selected_desc = st.selectbox("Select transaction description", matching_descriptions[:200])
         
         if selected_desc:
-            # Show current categorization for this description
-            current_cat_mask = st.session_state.transactions['description'] == selected_desc
-            if current_cat_mask.any():
-                current_row = st.session_state.transactions[current_cat_mask].iloc[0]
+            # Show current categorization for this description; the mask is reused
+            # when the new category is applied
+            mask = (transactions['description'] == selected_desc).to_numpy()
+            if mask.any():
+                current_row = transactions.iloc[mask.argmax()]
                 current_cat = current_row['category']
                 current_subcat = current_row['subcategory']
                 
@@ -736,9 +944,12 @@ elif page == "Categories":
                 # Apply recategorization
                 if st.button("Apply New Category"):
                     # Update all matching transactions
-                    mask = st.session_state.transactions['description'] == selected_desc
-                    st.session_state.transactions.loc[mask, 'category'] = new_cat
-                    st.session_state.transactions.loc[mask, 'subcategory'] = new_subcat
+                    # Categorical columns only accept values that are already among their categories
+                    for col, value in [('category', new_cat), ('subcategory', new_subcat)]:
+                        if value is not None and value not in transactions[col].cat.categories:
+                            transactions[col] = transactions[col].cat.add_categories([value])
+                    transactions.loc[mask, ['category', 'subcategory']] = [new_cat, new_subcat]
+                    set_transactions(transactions)
                     
                     count = mask.sum()
                     st.success(f"Updated {count} transaction(s) with description '{selected_desc}'")
@@ -755,73 +966,41 @@ elif page == "Tax Settings":
     # Country/region selector (for future expansion)
     tax_region = st.selectbox("Tax Region", ["United States"], disabled=True)
     
-    # Make a copy of current tax brackets for editing
-    tax_brackets = st.session_state.tax_brackets.copy()
-    
     st.subheader("Edit Tax Brackets")
+    st.write("Edit the brackets in the table below. Add or delete rows to change the number of brackets.")
     
-    # Create a form for each tax bracket
-    updated_brackets = []
-    
-    for i, bracket in enumerate(tax_brackets):
-        with st.expander(f"Bracket {i+1}: {bracket['min']} to {bracket['max']} at {bracket['rate']*100}%"):
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                min_val = st.number_input(f"Minimum Income ($)", 
-                                          value=float(bracket['min']), 
-                                          min_value=0.0, 
-                                          step=1000.0,
-                                          key=f"min_{i}")
-            with col2:
-                # For the highest bracket, allow Infinity
-                is_highest = i == len(tax_brackets) - 1
-                max_placeholder = "∞" if is_highest else None
-                max_val = st.number_input(f"Maximum Income ($)", 
-                                          value=float('inf') if is_highest and bracket['max'] == float('inf') else float(bracket['max']),
-                                          min_value=0.0, 
-                                          step=1000.0,
-                                          disabled=is_highest,
-                                          placeholder=max_placeholder,
-                                          key=f"max_{i}")
-            with col3:
-                rate = st.number_input(f"Tax Rate (%)", 
-                                       value=float(bracket['rate']*100), 
-                                       min_value=0.0, 
-                                       max_value=100.0, 
-                                       step=0.1,
-                                       key=f"rate_{i}") / 100
-            
-            updated_brackets.append({
-                "min": min_val,
-                "max": float('inf') if is_highest else max_val,
-                "rate": rate
-            })
-            
-            # Delete button for this bracket (except the last one)
-            if not is_highest and st.button(f"Delete Bracket {i+1}", key=f"delete_bracket_{i}"):
-                continue
-    
-    # Filter out any brackets that were marked for deletion
-    updated_brackets = [b for b in updated_brackets if b is not None]
+    # Edit all brackets in a single table; the highest bracket has no upper limit,
+    # which is shown as an empty maximum
+    brackets_df = pd.DataFrame(st.session_state.tax_brackets, columns=['min', 'max', 'rate'])
+    brackets_df['max'] = brackets_df['max'].replace(float('inf'), np.nan)
+    brackets_df['rate'] = brackets_df['rate'] * 100
     
-    # Add new bracket button
-    if st.button("Add New Tax Bracket"):
-        # Find the highest 'max' value in the current brackets
-        if updated_brackets:
-            last_max = max([b['max'] for b in updated_brackets if b['max'] != float('inf')])
-            # Update the current highest bracket
-            for b in updated_brackets:
-                if b['max'] == float('inf'):
-                    b['max'] = last_max + 50000
-            # Add a new highest bracket
-            updated_brackets.append({
-                "min": last_max + 50000,
-                "max": float('inf'),
-                "rate": 0.37  # Default rate for the new bracket
-            })
+    edited_brackets = st.data_editor(
+        brackets_df,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        key="tax_bracket_editor",
+        column_config={
+            'min': st.column_config.NumberColumn("Minimum Income ($)", min_value=0.0, step=1000.0, format="$%.2f", required=True),
+            'max': st.column_config.NumberColumn("Maximum Income ($)", min_value=0.0, step=1000.0, format="$%.2f",
+                                                 help="Leave empty for no upper limit"),
+            'rate': st.column_config.NumberColumn("Tax Rate (%)", min_value=0.0, max_value=100.0, step=0.1, format="%.1f%%", required=True)
+        }
+    )
     
     # Save changes
     if st.button("Save Tax Bracket Changes"):
+        # Skip incomplete rows and restore the unlimited maximum and fractional rates
+        edited_brackets = edited_brackets.dropna(subset=['min', 'rate'])
+        updated_brackets = [
+            {
+                "min": float(bracket['min']),
+                "max": float('inf') if pd.isna(bracket['max']) else float(bracket['max']),
+                "rate": float(bracket['rate']) / 100
+            }
+            for bracket in edited_brackets.to_dict('records')
+        ]
         # Sort brackets by min value to ensure proper order
         updated_brackets.sort(key=lambda x: x['min'])
         st.session_state.tax_brackets = updated_brackets
@@ -842,19 +1021,23 @@ elif page == "Tax Settings":
     tax_df = pd.DataFrame(tax_data, columns=["Minimum Income", "Maximum Income", "Tax Rate"])
     st.table(tax_df)
     
-    # Sample tax calculation
-    st.subheader("Tax Liability Calculator")
-    sample_income = st.number_input("Enter annual income to calculate tax", min_value=0.0, value=75000.0, step=5000.0)
-    if sample_income > 0:
-        tax_info = calculate_tax_liability(sample_income, st.session_state.tax_brackets)
-        
-        st.write(f"Total tax: **${tax_info['total_tax']:,.2f}**")
-        st.write(f"Effective tax rate: **{tax_info['effective_rate']:.2f}%**")
-        
-        # Show breakdown
-        st.write("Tax Bracket Breakdown:")
-        for bracket in tax_info['bracket_breakdown']:
-            st.write(f"- ${bracket['income_in_bracket']:,.2f} taxed at {bracket['rate']*100:.1f}% = ${bracket['tax_amount']:,.2f}")
+    # Sample tax calculation; run as a fragment so typing an income only reruns the calculator
+    @st.fragment
+    def show_tax_calculator():
+        st.subheader("Tax Liability Calculator")
+        sample_income = st.number_input("Enter annual income to calculate tax", min_value=0.0, value=75000.0, step=5000.0)
+        if sample_income > 0:
+            tax_info = get_tax_liability(round(sample_income * 100), brackets_key(st.session_state.tax_brackets))
+            
+            st.write(f"Total tax: **${tax_info['total_tax']:,.2f}**")
+            st.write(f"Effective tax rate: **{tax_info['effective_rate']:.2f}%**")
+            
+            # Show breakdown
+            st.write("Tax Bracket Breakdown:")
+            for bracket in tax_info['bracket_breakdown']:
+                st.write(f"- ${bracket['income_in_bracket']:,.2f} taxed at {bracket['rate']*100:.1f}% = ${bracket['tax_amount']:,.2f}")
+    
+    show_tax_calculator()
 
 elif page == "Export":
     st.title("Export Data")
@@ -874,22 +1057,22 @@ elif page == "Export":
         # Date range filter
         col1, col2 = st.columns(2)
         with col1:
-            start_date = st.date_input("Start Date", st.session_state.transactions['date'].min().date())
+            start_date = st.date_input("Start Date", st.session_state.date_min)
         with col2:
-            end_date = st.date_input("End Date", st.session_state.transactions['date'].max().date())
+            end_date = st.date_input("End Date", st.session_state.date_max)
         
         # Filter data by date
-        filtered_data = st.session_state.transactions[
-            (st.session_state.transactions['date'] >= pd.Timestamp(start_date)) & 
-            (st.session_state.transactions['date'] <= pd.Timestamp(end_date))
-        ]
+        filtered_data = get_filtered_transactions(
+            st.session_state.transactions, st.session_state.transactions_key, start_date, end_date
+        )
         
         # Format options
         export_format = st.radio("Export Format", ["CSV", "Excel"])
         
         if st.button("Generate Export"):
             if export_format == "CSV":
-                csv = filtered_data.to_csv(index=False)
+                # The preformatted display dates are not part of the exported data
+                csv = filtered_data.drop(columns='date_str').to_csv(index=False)
                 # Create a download button
                 st.download_button(
                     label="Download CSV",
@@ -898,42 +1081,51 @@ elif page == "Export":
                     mime="text/csv"
                 )
             else:  # Excel
-                # Create in-memory Excel file
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    filtered_data.to_excel(writer, sheet_name='Transactions', index=False)
-                    
-                    # Add summary sheet
-                    summary = calculate_summary(filtered_data)
-                    summary_df = pd.DataFrame({
-                        'Metric': ['Total Income', 'Total Expenses', 'Net Savings', 'Savings Rate'],
-                        'Value': [
-                            f"${summary['total_income']:.2f}", 
-                            f"${summary['total_expenses']:.2f}", 
-                            f"${summary['net_savings']:.2f}", 
-                            f"{summary['savings_rate']:.1f}%"
-                        ]
-                    })
-                    summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                    
-                    # Add category breakdown sheet
-                    cat_summary = filtered_data.groupby('category')['amount'].sum().reset_index()
-                    # Split into income and expenses
-                    income = cat_summary[cat_summary['amount'] > 0].sort_values('amount', ascending=False)
-                    expenses = cat_summary[cat_summary['amount'] < 0].sort_values('amount')
-                    expenses['amount'] = expenses['amount'].abs()  # Make expenses positive for reporting
+                # Write the Excel file to a temporary file rather than an in-memory buffer, so the
+                # workbook is only held in memory once, when it is read for the download
+                # xlsxwriter's constant_memory mode is not used: to_excel writes cells column by
+                # column, and constant_memory silently drops cells written to earlier rows
+                with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as output:
+                    output_path = output.name
+                try:
+                    with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+                        filtered_data.drop(columns='date_str').to_excel(writer, sheet_name='Transactions', index=False)
+                        
+                        # Add summary sheet
+                        summary = get_summary(
+                            st.session_state.transactions, st.session_state.transactions_key, start_date, end_date
+                        )
+                        summary_df = pd.DataFrame({
+                            'Metric': ['Total Income', 'Total Expenses', 'Net Savings', 'Savings Rate'],
+                            'Value': [
+                                f"${summary['total_income']:.2f}", 
+                                f"${summary['total_expenses']:.2f}", 
+                                f"${summary['net_savings']:.2f}", 
+                                f"{summary['savings_rate']:.1f}%"
+                            ]
+                        })
+                        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+                        
+                        # Add category breakdown sheet
+                        cat_summary = filtered_data.groupby('category', observed=True)['amount'].sum().reset_index()
+                        # Split into income and expenses from a single sign pass over the totals
+                        sign = np.sign(cat_summary['amount'].to_numpy())
+                        income = cat_summary[sign > 0].sort_values('amount', ascending=False)
+                        expenses = cat_summary[sign < 0].sort_values('amount')
+                        expenses = expenses.assign(amount=-expenses['amount'])  # Make expenses positive for reporting
+                        
+                        income.to_excel(writer, sheet_name='Income Breakdown', index=False)
+                        expenses.to_excel(writer, sheet_name='Expense Breakdown', index=False)
                     
-                    income.to_excel(writer, sheet_name='Income Breakdown', index=False)
-                    expenses.to_excel(writer, sheet_name='Expense Breakdown', index=False)
-                
-                output.seek(0)
-                
-                st.download_button(
-                    label="Download Excel",
-                    data=output,
-                    file_name=f"financial_report_{start_date}_to_{end_date}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                    with open(output_path, 'rb') as output:
+                        st.download_button(
+                            label="Download Excel",
+                            data=output,
+                            file_name=f"financial_report_{start_date}_to_{end_date}.xlsx",
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        )
+                finally:
+                    os.remove(output_path)
         
         # Generate financial report
         st.subheader("Generate Financial Report")
@@ -944,22 +1136,23 @@ elif page == "Export":
         
         if st.button("Generate Report"):
             # Calculate summary for the filtered data
-            summary = calculate_summary(filtered_data)
+            summary = get_summary(
+                st.session_state.transactions, st.session_state.transactions_key, start_date, end_date
+            )
             
             # Add report-specific calculations based on the selected report type
             if report_type == "Monthly Summary":
-                # Monthly grouping
-                monthly_data = filtered_data.copy()
-                monthly_data['month'] = monthly_data['date'].dt.to_period('M')
-                monthly_summary = monthly_data.groupby('month').agg({
-                    'amount': lambda x: (x > 0).sum(),  # Count of income transactions
-                    'amount': lambda x: (x < 0).sum(),  # Count of expense transactions
-                    'amount': lambda x: x[x > 0].sum(),  # Sum of income
-                    'amount': lambda x: x[x < 0].sum()   # Sum of expenses
-                }).reset_index()
+                # Monthly grouping, summing sign masks and clipped amounts in one groupby
+                amounts = filtered_data['amount']
+                monthly_summary = pd.DataFrame({
+                    'income_count': amounts > 0,  # Count of income transactions
+                    'expense_count': amounts < 0,  # Count of expense transactions
+                    'income_sum': amounts.clip(lower=0),  # Sum of income
+                    'expense_sum': amounts.clip(upper=0)  # Sum of expenses
+                }).groupby(filtered_data['date'].dt.to_period('M').rename('month')).sum().reset_index()
                 
                 # Format as report
-                report = f"""
+                report_parts = [f"""
                 # Monthly Financial Summary: {start_date} to {end_date}
                 
                 ## Overall Summary
@@ -969,34 +1162,31 @@ elif page == "Export":
                 - Savings Rate: {summary['savings_rate']:.1f}%
                 
                 ## Monthly Breakdown
-                """
+                """]
                 
                 # Add monthly data
                 for _, row in monthly_summary.iterrows():
                     month_str = row['month'].strftime('%B %Y')
-                    report += f"""
+                    report_parts.append(f"""
                     ### {month_str}
-                    - Income: ${row['amount'][2]:.2f}
-                    - Expenses: ${abs(row['amount'][3]):.2f}
-                    - Net: ${(row['amount'][2] + row['amount'][3]):.2f}
-                    - Transactions: {row['amount'][0] + abs(row['amount'][1])}
-                    """
+                    - Income: ${row['income_sum']:.2f}
+                    - Expenses: ${abs(row['expense_sum']):.2f}
+                    - Net: ${(row['income_sum'] + row['expense_sum']):.2f}
+                    - Transactions: {row['income_count'] + row['expense_count']}
+                    """)
             
             elif report_type == "Yearly Summary":
-                # Yearly grouping
-                yearly_data = filtered_data.copy()
-                yearly_data['year'] = yearly_data['date'].dt.year
-                yearly_summary = yearly_data.groupby('year').agg({
-                    'amount': [
-                        ('income_count', lambda x: (x > 0).sum()),
-                        ('expense_count', lambda x: (x < 0).sum()),
-                        ('income_sum', lambda x: x[x > 0].sum()),
-                        ('expense_sum', lambda x: x[x < 0].sum())
-                    ]
-                }).reset_index()
+                # Yearly grouping on the year of each date, without copying the transactions
+                amounts = filtered_data['amount']
+                yearly_summary = pd.DataFrame({
+                    'income_count': amounts > 0,  # Count of income transactions
+                    'expense_count': amounts < 0,  # Count of expense transactions
+                    'income_sum': amounts.clip(lower=0),  # Sum of income
+                    'expense_sum': amounts.clip(upper=0)  # Sum of expenses
+                }).groupby(filtered_data['date'].dt.year.rename('year')).sum().reset_index()
                 
                 # Format as report
-                report = f"""
+                report_parts = [f"""
                 # Yearly Financial Summary: {start_date} to {end_date}
                 
                 ## Overall Summary
@@ -1006,91 +1196,92 @@ elif page == "Export":
                 - Savings Rate: {summary['savings_rate']:.1f}%
                 
                 ## Yearly Breakdown
-                """
+                """]
                 
                 # Add yearly data
-                for _, row in yearly_summary.iterrows():
-                    year = row['year']
-                    income = row[('amount', 'income_sum')]
-                    expenses = row[('amount', 'expense_sum')]
+                for row in yearly_summary.itertuples(index=False):
+                    year = row.year
+                    income = row.income_sum
+                    expenses = row.expense_sum
                     net = income + expenses
                     savings_rate = (net / income * 100) if income > 0 else 0
                     
-                    report += f"""
+                    report_parts.append(f"""
                     ### {year}
                     - Income: ${income:.2f}
                     - Expenses: ${abs(expenses):.2f}
                     - Net Savings: ${net:.2f}
                     - Savings Rate: {savings_rate:.1f}%
-                    - Transactions: {row[('amount', 'income_count')] + row[('amount', 'expense_count')]}
-                    """
+                    - Transactions: {row.income_count + row.expense_count}
+                    """)
             
             elif report_type == "Category Analysis":
-                # Category analysis
-                cat_data = filtered_data.copy()
+                # Category analysis on the expense rows only
+                expense_data = filtered_data.loc[filtered_data['amount'].lt(0), ['category', 'subcategory', 'amount']]
                 
-                # Calculate total expenses by category
-                cat_expenses = cat_data[cat_data['amount'] < 0].groupby('category')['amount'].sum().abs().sort_values(ascending=False)
+                # Calculate total expenses by category; the sums are negative, so sorting
+                # them ascending lists the largest expenses first without taking abs()
+                cat_expenses = expense_data.groupby('category', observed=True)['amount'].sum().sort_values()
                 
                 # Calculate subcategory breakdown
-                subcat_expenses = cat_data[cat_data['amount'] < 0].groupby(['category', 'subcategory'])['amount'].sum().abs()
+                subcat_expenses = expense_data.groupby(['category', 'subcategory'], observed=True)['amount'].sum()
                 
                 # Format as report
-                report = f"""
+                report_parts = [f"""
                 # Expense Category Analysis: {start_date} to {end_date}
                 
                 ## Overall Expenses
                 - Total Expenses: ${summary['total_expenses']:.2f}
                 
                 ## Category Breakdown
-                """
+                """]
                 
                 # Add category data
                 for cat, amount in cat_expenses.items():
-                    report += f"""
-                    ### {cat}: ${amount:.2f} ({amount/summary['total_expenses']*100:.1f}%)
-                    """
+                    report_parts.append(f"""
+                    ### {cat}: ${-amount:.2f} ({-amount/summary['total_expenses']*100:.1f}%)
+                    """)
                     
                     # Add subcategories
                     if cat in subcat_expenses.index.get_level_values(0):
-                        for subcat, subamount in subcat_expenses[cat].sort_values(ascending=False).items():
-                            report += f"- {subcat}: ${subamount:.2f} ({subamount/amount*100:.1f}%)\n"
+                        for subcat, subamount in subcat_expenses[cat].sort_values().items():
+                            report_parts.append(f"- {subcat}: ${-subamount:.2f} ({subamount/amount*100:.1f}%)\n")
             
             elif report_type == "Tax Report":
                 # Get yearly income for tax calculations
-                yearly_data = filtered_data.copy()
-                yearly_data['year'] = yearly_data['date'].dt.year
-                yearly_income = yearly_data[yearly_data['amount'] > 0].groupby('year')['amount'].sum()
+                income_data = filtered_data.loc[filtered_data['amount'] > 0, ['date', 'amount']]
+                yearly_income = income_data.groupby(income_data['date'].dt.year.rename('year'))['amount'].sum()
                 
                 # Format as report
-                report = f"""
+                report_parts = [f"""
                 # Tax Liability Report: {start_date} to {end_date}
                 
                 ## Current Tax Brackets
-                """
+                """]
                 
                 # Add tax bracket information
                 for bracket in st.session_state.tax_brackets:
                     max_display = "∞" if bracket['max'] == float('inf') else f"${bracket['max']:,.2f}"
-                    report += f"- ${bracket['min']:,.2f} to {max_display}: {bracket['rate']*100:.1f}%\n"
+                    report_parts.append(f"- ${bracket['min']:,.2f} to {max_display}: {bracket['rate']*100:.1f}%\n")
                 
-                report += "\n## Tax Liability by Year\n"
+                report_parts.append("\n## Tax Liability by Year\n")
                 
-                # Calculate tax for each year
-                for year, income in yearly_income.items():
-                    tax_info = calculate_tax_liability(income, st.session_state.tax_brackets)
-                    
-                    report += f"""
+                # Calculate tax for every year in one pass over the brackets
+                yearly_tax = calculate_tax_liabilities(yearly_income.to_numpy(), st.session_state.tax_brackets)
+                for (year, income), tax_info in zip(yearly_income.items(), yearly_tax):
+                    report_parts.append(f"""
                     ### {year}
                     - Annual Income: ${income:.2f}
                     - Estimated Tax: ${tax_info['total_tax']:.2f}
                     - Effective Tax Rate: {tax_info['effective_rate']:.2f}%
                     
                     #### Tax Bracket Breakdown:
-                    """
+                    """)
                     
                     for bracket in tax_info['bracket_breakdown']:
-                        report += f"- ${bracket['income_in_bracket']:,.2f} taxed at {bracket['rate']*100:.1f}% = ${bracket['tax_amount']:,.2f}\n"
+                        report_parts.append(f"- ${bracket['income_in_bracket']:,.2f} taxed at {bracket['rate']*100:.1f}% = ${bracket['tax_amount']:,.2f}\n")
+            
+            report = "".join(report_parts)
             
             # Display the report
             st.markdown(report)
@@ -66,21 +66,26 @@ if len(sys.argv) > 1:
             
             # Print a few categorized transactions with detailed information
             print("\nSample of categorized transactions:")
-            for idx, row in categorized_df.head(15).iterrows():
+            sample = categorized_df.head(15)
+            if 'raw_subcategory' in sample.columns:
+                original_subcategories = sample['raw_subcategory']
+            else:
+                original_subcategories = ['N/A'] * len(sample)
+            sample_rows = zip(sample.index, sample['date'], sample['description'], sample['amount'],
+                              original_subcategories, sample['category'], sample['subcategory'])
+            for idx, date, description, amount, original_subcategory, category, subcategory in sample_rows:
                 # Make a separate match_vendor call to show the matching process
-                from utils.vendor_database import match_vendor
-                original_subcategory = row.get('raw_subcategory', 'N/A')
-                match_result = match_vendor(row['description'], original_subcategory, row['amount'])
+                match_result = match_vendor(description, original_subcategory, amount)
                 
                 match_status = "MATCHED" if match_result else "NO MATCH"
                 
                 print(f"Transaction #{idx}:")
-                print(f"  Date: {row['date'].strftime('%Y-%m-%d')}")
-                print(f"  Description: {row['description']}")
-                print(f"  Amount: £{row['amount']:.2f}")
+                print(f"  Date: {date.strftime('%Y-%m-%d')}")
+                print(f"  Description: {description}")
+                print(f"  Amount: £{amount:.2f}")
                 print(f"  Original Subcategory: {original_subcategory}")
-                print(f"  Final Category: {row['category']}")
-                print(f"  Final Subcategory: {row['subcategory']}")
+                print(f"  Final Category: {category}")
+                print(f"  Final Subcategory: {subcategory}")
                 print(f"  Match Status: {match_status}")
                 if match_result:
                     print(f"  Vendor Match: {match_result.get('category')}/{match_result.get('subcategory')}")
@@ -102,12 +107,12 @@ if len(sys.argv) > 1:
             
             # Print expense breakdown by category
             print("\nExpense Breakdown by Category:")
-            for category, amount in expense_df.groupby('category')['amount'].sum().items():
+            for category, amount in expense_df.groupby('category', observed=True)['amount'].sum().items():
                 print(f"  {category}: £{abs(amount):.2f}")
             
             # Print income breakdown by subcategory
             print("\nIncome Breakdown by Subcategory:")
-            for subcategory, amount in income_df.groupby('subcategory')['amount'].sum().items():
+            for subcategory, amount in income_df.groupby('subcategory', observed=True)['amount'].sum().items():
                 print(f"  {subcategory}: £{amount:.2f}")
                 
         except Exception as e:
@@ -0,0 +1,47 @@
+import io
+import sys
+
+from utils.file_handler import parse_csv
+
+# Barclays export where some rows have a blank or space-only Number field
+BARCLAYS_CSV = (
+    "Number,Date,Account,Amount,Subcategory,Memo\n"
+    " ,01/03/2024,20-00-00 12345678,-12.50,Card Purchase,TESCO STORES 1234\n"
+    ",02/03/2024,20-00-00 12345678,1500.00,Counter Credit,ACME LTD SALARY\n"
+    "3,03/03/2024,20-00-00 12345678,-45.00,Direct Debit,BUPA\n"
+)
+
+def test_barclays_blank_number():
+    """
+    Test that a Barclays CSV with blank or space-only Number fields parses into the
+    standardized columns instead of falling back to generic parsing.
+    """
+    df = parse_csv(io.BytesIO(BARCLAYS_CSV.encode('utf-8')))
+    
+    for column in ['date', 'description', 'amount', 'subcategory']:
+        assert column in df.columns, f"Missing column: {column}"
+    assert len(df) == 3
+    assert df['amount'].tolist() == [-12.5, 1500.0, -45.0]
+    assert df['date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-03-01', '2024-03-02', '2024-03-03']
+    return 0
+
+def test_barclays_header_variants():
+    """
+    Test that a Barclays header is still recognised with trailing commas, padded
+    field names or a preamble line before it.
+    """
+    header, *rows = BARCLAYS_CSV.splitlines()
+    variants = {
+        'trailing comma': '\n'.join([header + ','] + [row + ',' for row in rows]),
+        'padded fields': '\n'.join([' , '.join(header.split(',')) + ' '] + rows),
+        'preamble': '\n'.join(['Statement for account 20-00-00 12345678', header] + rows)
+    }
+    
+    for name, csv in variants.items():
+        df = parse_csv(io.BytesIO(csv.encode('utf-8')))
+        assert 'raw_subcategory' in df.columns, f"{name}: not parsed as Barclays"
+        assert df['amount'].tolist() == [-12.5, 1500.0, -45.0], f"{name}: wrong amounts"
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(test_barclays_blank_number() or test_barclays_header_variants())
@@ -0,0 +1,114 @@
+import math
+import sys
+
+from utils.tax_calculator import calculate_tax_liability, calculate_tax_liabilities
+
+# Default US tax brackets for 2023 (single filer), as set up in app.py
+DEFAULT_BRACKETS = [
+    {"min": 0, "max": 11000, "rate": 0.10},
+    {"min": 11000, "max": 44725, "rate": 0.12},
+    {"min": 44725, "max": 95375, "rate": 0.22},
+    {"min": 95375, "max": 182100, "rate": 0.24},
+    {"min": 182100, "max": 231250, "rate": 0.32},
+    {"min": 231250, "max": 578125, "rate": 0.35},
+    {"min": 578125, "max": float('inf'), "rate": 0.37}
+]
+
+# Brackets with untaxed income between 10,000 and 20,000, listed out of order
+GAP_BRACKETS = [
+    {"min": 20000, "max": 30000, "rate": 0.20},
+    {"min": 0, "max": 10000, "rate": 0.10}
+]
+
+# A tax-free allowance followed by one unbounded bracket
+UNBOUNDED_BRACKETS = [
+    {"min": 0, "max": 10000, "rate": 0.0},
+    {"min": 10000, "max": float('inf'), "rate": 0.5}
+]
+
+def breakdown_pairs(tax_info):
+    """
+    Describe a tax breakdown as (income_in_bracket, tax_amount) pairs.
+    """
+    return [(bracket['income_in_bracket'], bracket['tax_amount']) for bracket in tax_info['bracket_breakdown']]
+
+def assert_close(actual, expected, message):
+    """
+    Assert that two numbers, or two lists of number pairs, agree to within a cent.
+    """
+    if isinstance(expected, list):
+        assert len(actual) == len(expected), f"{message}: {actual} != {expected}"
+        for actual_pair, expected_pair in zip(actual, expected):
+            for a, e in zip(actual_pair, expected_pair):
+                assert math.isclose(a, e, abs_tol=0.005), f"{message}: {actual} != {expected}"
+    else:
+        assert math.isclose(actual, expected, abs_tol=0.005), f"{message}: {actual} != {expected}"
+
+def test_default_brackets():
+    """
+    Test that income is taxed only on the part falling inside each bracket.
+    """
+    tax_info = calculate_tax_liability(75000, DEFAULT_BRACKETS)
+    
+    assert_close(tax_info['total_tax'], 1100 + 4047 + 6660.5, "75,000 total")
+    assert_close(tax_info['effective_rate'], 11807.5 / 75000 * 100, "75,000 effective rate")
+    assert_close(breakdown_pairs(tax_info), [(11000, 1100), (33725, 4047), (30275, 6660.5)], "75,000 breakdown")
+    
+    # Income at a bracket boundary fills the brackets below it exactly
+    tax_info = calculate_tax_liability(44725, DEFAULT_BRACKETS)
+    assert_close(tax_info['total_tax'], 5147, "44,725 total")
+    assert_close(breakdown_pairs(tax_info), [(11000, 1100), (33725, 4047)], "44,725 breakdown")
+    
+    # No income means no tax and no brackets in the breakdown
+    tax_info = calculate_tax_liability(0, DEFAULT_BRACKETS)
+    assert tax_info['total_tax'] == 0 and tax_info['effective_rate'] == 0
+    assert tax_info['bracket_breakdown'] == []
+    return 0
+
+def test_gap_brackets():
+    """
+    Test that income between two brackets is not taxed.
+    """
+    tax_info = calculate_tax_liability(15000, GAP_BRACKETS)
+    assert_close(tax_info['total_tax'], 1000, "15,000 total")
+    assert_close(breakdown_pairs(tax_info), [(10000, 1000)], "15,000 breakdown")
+    
+    tax_info = calculate_tax_liability(25000, GAP_BRACKETS)
+    assert_close(tax_info['total_tax'], 2000, "25,000 total")
+    assert_close(breakdown_pairs(tax_info), [(10000, 1000), (5000, 1000)], "25,000 breakdown")
+    
+    # Income above the top bracket is not taxed when the top bracket is bounded
+    tax_info = calculate_tax_liability(50000, GAP_BRACKETS)
+    assert_close(tax_info['total_tax'], 3000, "50,000 total")
+    return 0
+
+def test_unbounded_top_bracket():
+    """
+    Test that an unbounded top bracket taxes all income above its minimum.
+    """
+    tax_info = calculate_tax_liability(1000000, UNBOUNDED_BRACKETS)
+    assert_close(tax_info['total_tax'], 495000, "1,000,000 total")
+    assert_close(breakdown_pairs(tax_info), [(10000, 0), (990000, 495000)], "1,000,000 breakdown")
+    assert tax_info['bracket_breakdown'][-1]['max'] == float('inf')
+    return 0
+
+def test_batch_matches_scalar():
+    """
+    Test that calculate_tax_liabilities gives the same results as calculate_tax_liability.
+    """
+    incomes = [0, 5000, 10000, 15000, 44725, 75000, 250000, 1000000]
+    for brackets in (DEFAULT_BRACKETS, GAP_BRACKETS, UNBOUNDED_BRACKETS):
+        for batch, income in zip(calculate_tax_liabilities(incomes, brackets), incomes):
+            scalar = calculate_tax_liability(income, brackets)
+            assert_close(batch['total_tax'], scalar['total_tax'], f"{income} total")
+            assert_close(batch['effective_rate'], scalar['effective_rate'], f"{income} effective rate")
+            assert_close(breakdown_pairs(batch), breakdown_pairs(scalar), f"{income} breakdown")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(
+        test_default_brackets()
+        or test_gap_brackets()
+        or test_unbounded_top_bracket()
+        or test_batch_matches_scalar()
+    )
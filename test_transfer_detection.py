@@ -12,6 +12,7 @@ warnings.simplefilter(action='ignore', category=pd.errors.SettingWithCopyWarning
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logging.getLogger('matplotlib').setLevel(logging.WARNING)
 logging.getLogger('PIL').setLevel(logging.WARNING)
+logging.getLogger('utils.data_processor').setLevel(logging.WARNING)
 
 def test_transfer_detection():
     """
@@ -28,10 +29,6 @@ def test_transfer_detection():
     # Add debug printing
     print("Starting transfer detection test...")
     
-    # Suppress print statements from the categorize_transactions function
-    import builtins
-    real_print = builtins.print
-    builtins.print = lambda *args, **kwargs: None  # Do nothing
     # Create default categories dictionary for testing
     categories = {
         'Income': ['Salary/Wages', 'Business Income', 'Dividends', 'Interest', 'Other Income'],
@@ -59,8 +56,6 @@ def test_transfer_detection():
         # Filter for internal transfers
         transfers = categorized_df[(categorized_df['category'] == 'Transfer') & 
                                   (categorized_df['subcategory'] == 'Internal Transfer')]
-        # Restore the real print function for our output
-        builtins.print = real_print
         
         # Print the results
         print("\n=== TRANSFER DETECTION TEST RESULTS ===")
@@ -1,8 +1,98 @@
 import pandas as pd
+import numpy as np
 import re
 from datetime import datetime
 import json
-from utils.vendor_database import match_vendor, VENDOR_DATABASE
+import logging
+from functools import lru_cache
+from utils.vendor_database import match_vendors, VENDOR_DATABASE
+
+logger = logging.getLogger(__name__)
+
+# Keywords for common categories, used when no vendor matches a transaction
+CATEGORY_KEYWORDS = {
+    'Housing': [
+        'rent', 'mortgage', 'home', 'apartment', 'electric', 'water', 'gas', 'utility',
+        'utilities', 'internet', 'sewage', 'waste', 'homeowner', 'hoa', 'maintenance',
+        'repair', 'lawn', 'garden'
+    ],
+    'Transportation': [
+        'gas', 'gasoline', 'fuel', 'uber', 'lyft', 'taxi', 'car', 'auto', 'vehicle',
+        'public transit', 'bus', 'train', 'subway', 'metro', 'parking', 'toll',
+        'maintenance', 'repair', 'insurance', 'dmv', 'registration'
+    ],
+    'Food': [
+        'grocery', 'groceries', 'supermarket', 'market', 'food', 'restaurant', 'cafe',
+        'coffee', 'diner', 'dinner', 'lunch', 'breakfast', 'take-out', 'takeout',
+        'delivery', 'grubhub', 'doordash', 'ubereats', 'bakery', 'pizza'
+    ],
+    'Healthcare': [
+        'doctor', 'hospital', 'medical', 'dental', 'dentist', 'pharmacy', 'prescription',
+        'drug', 'health', 'insurance', 'therapy', 'gym', 'fitness', 'vitamin', 'eyecare',
+        'optometrist', 'eyeglasses', 'contacts'
+    ],
+    'Entertainment': [
+        'movie', 'theatre', 'theater', 'concert', 'music', 'spotify', 'netflix',
+        'hulu', 'disney', 'amazon prime', 'streaming', 'game', 'book', 'hobby',
+        'ticket', 'event', 'sports', 'subscription'
+    ],
+    'Shopping': [
+        'amazon', 'walmart', 'target', 'clothing', 'apparel', 'department', 'store',
+        'mall', 'retail', 'electronics', 'computer', 'phone', 'merchandise', 'ebay',
+        'online', 'purchase', 'shop'
+    ],
+    'Education': [
+        'school', 'university', 'college', 'tuition', 'education', 'student', 'loan',
+        'book', 'course', 'class', 'degree', 'training'
+    ],
+    'Travel': [
+        'hotel', 'airbnb', 'airline', 'flight', 'travel', 'trip', 'vacation',
+        'rental car', 'cruise', 'tour', 'booking', 'resort', 'airport'
+    ],
+    'Savings': [
+        'transfer', 'savings', 'investment', 'deposit', 'stock', 'bond', 'retirement',
+        '401k', 'ira', 'roth', 'etf', 'mutual fund'
+    ],
+    'Miscellaneous': [
+        'gift', 'donation', 'charity', 'fee', 'interest', 'tax', 'insurance',
+        'subscription', 'dues', 'membership', 'service', 'misc'
+    ]
+}
+
+
+# Distinct category keywords, several of which are shared between categories, and a
+# matrix marking which categories (columns, in CATEGORY_KEYWORDS order) list each keyword
+CATEGORY_KEYWORD_LIST = list(dict.fromkeys(
+    keyword for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords
+))
+CATEGORY_KEYWORD_MEMBERSHIP = np.array([
+    [keyword in keywords for keywords in CATEGORY_KEYWORDS.values()]
+    for keyword in CATEGORY_KEYWORD_LIST
+], dtype=np.int32)
+
+# Keywords that suggest a transaction is income, used to correct the sign of negative amounts
+INCOME_KEYWORDS = [
+    'salary', 'wage', 'payroll', 'direct deposit', 'payment received', 
+    'dividend', 'interest', 'refund', 'cashback', 'tax return', 'tax refund',
+    'deposit', 'credit', 'income', 'bonus', 'commission', 'pension', 'benefit',
+    'incoming', 'credit in', 'paid in', 'payment in', 'transfer in'
+]
+
+# Keywords for internal transfers between accounts
+TRANSFER_KEYWORDS = ['saver', 'saving', 'transfer to', 'transfer from', 'instant saver', 'instant access']
+
+# Keywords that suggest a positive transaction is really an expense
+EXPENSE_KEYWORDS = [
+    'payment to', 'purchase', 'fee', 'charge', 'bill', 'debit', 'withdrawal',
+    'card payment', 'subscription', 'order', 'uber', 'lyft', 'online payment',
+    'direct debit', 'transfer to', 'payment out', 'paid out'
+]
+
+# Each keyword list compiled into a single alternation, so a description is scanned once per list
+INCOME_KEYWORDS_RE = re.compile('|'.join(map(re.escape, INCOME_KEYWORDS)))
+TRANSFER_KEYWORDS_RE = re.compile('|'.join(map(re.escape, TRANSFER_KEYWORDS)))
+EXPENSE_KEYWORDS_RE = re.compile('|'.join(map(re.escape, EXPENSE_KEYWORDS)))
+
 
 def categorize_transactions(df, categories):
     """
@@ -21,209 +111,203 @@ def categorize_transactions(df, categories):
     # Create copies to avoid SettingWithCopyWarning
     result_df = df.copy()
     
-    # Initialize default categories
-    result_df['category'] = 'Uncategorized'
-    result_df['subcategory'] = 'Other'
-    
     # Don't immediately categorize all positive amounts as income
     # We'll use vendor matching first, and only use this as a fallback
     # Only set positive amounts as Income after vendor matching, not before
     
-    # Define income-related keywords
-    income_keywords = [
-        'salary', 'wage', 'payroll', 'direct deposit', 'payment received', 
-        'dividend', 'interest', 'refund', 'cashback', 'tax return', 'tax refund',
-        'deposit', 'credit', 'income', 'bonus', 'commission', 'pension', 'benefit',
-        'incoming', 'credit in', 'paid in', 'payment in', 'transfer in'
-    ]
-    
     # Scan descriptions for income keywords
     descriptions_lower = result_df['description'].str.lower()
+    negative_amounts = (result_df['amount'] < 0).to_numpy()
+    positive_amounts = (result_df['amount'] > 0).to_numpy()
     
     # Find transactions that are negative but contain income keywords (incorrect sign)
-    incorrect_income = (result_df['amount'] < 0) & descriptions_lower.apply(
-        lambda desc: any(keyword in desc for keyword in income_keywords)
-    )
+    incorrect_income = negative_amounts & descriptions_lower.str.contains(INCOME_KEYWORDS_RE, na=False).to_numpy()
     
     # Special case for Payward/cryptocurrency investments
-    payward_transactions = descriptions_lower.apply(lambda desc: 'payward' in desc)
+    payward_transactions = descriptions_lower.str.contains('payward', regex=False, na=False).to_numpy()
     
     # Check for internal transfers between accounts
-    transfer_keywords = ['saver', 'saving', 'transfer to', 'transfer from', 'instant saver', 'instant access']
-    internal_transfer_mask = descriptions_lower.apply(
-        lambda desc: any(keyword in desc for keyword in transfer_keywords)
-    )
+    internal_transfer_mask = descriptions_lower.str.contains(TRANSFER_KEYWORDS_RE, na=False).to_numpy()
     
     # Find transactions that are positive but don't look like income
-    expense_keywords = [
-        'payment to', 'purchase', 'fee', 'charge', 'bill', 'debit', 'withdrawal',
-        'card payment', 'subscription', 'order', 'uber', 'lyft', 'online payment',
-        'direct debit', 'transfer to', 'payment out', 'paid out'
-    ]
-    
-    incorrect_expense = (result_df['amount'] > 0) & descriptions_lower.apply(
-        lambda desc: any(keyword in desc for keyword in expense_keywords)
-    )
-    
-    # Apply corrections based on keywords
-    result_df.loc[incorrect_income & ~payward_transactions, 'category'] = 'Income'
-    result_df.loc[payward_transactions, 'category'] = 'Savings'
-    result_df.loc[payward_transactions, 'subcategory'] = 'Investments'
-    
-    # Mark internal transfers
-    result_df.loc[internal_transfer_mask, 'category'] = 'Transfer'
-    result_df.loc[internal_transfer_mask, 'subcategory'] = 'Internal Transfer'
-    
-    result_df.loc[incorrect_expense, 'category'] = 'Uncategorized'  # Will be categorized in next step
-    
-    # Create a description lowercase column for matching purposes
-    descriptions = result_df['description'].str.lower()
-    
-    # Print sample transactions for debugging
-    print("\nSample transaction descriptions for matching:")
-    sample_descriptions = descriptions.head(10).tolist()
-    for desc in sample_descriptions:
-        print(f"- '{desc}'")
-        
-    # Print full dataframe for debugging
-    print("\nFull dataframe sample:")
-    print(result_df.head(10).to_string())
-    
-    # Define keywords for common categories
-    category_keywords = {
-        'Housing': [
-            'rent', 'mortgage', 'home', 'apartment', 'electric', 'water', 'gas', 'utility',
-            'utilities', 'internet', 'sewage', 'waste', 'homeowner', 'hoa', 'maintenance',
-            'repair', 'lawn', 'garden'
-        ],
-        'Transportation': [
-            'gas', 'gasoline', 'fuel', 'uber', 'lyft', 'taxi', 'car', 'auto', 'vehicle',
-            'public transit', 'bus', 'train', 'subway', 'metro', 'parking', 'toll',
-            'maintenance', 'repair', 'insurance', 'dmv', 'registration'
-        ],
-        'Food': [
-            'grocery', 'groceries', 'supermarket', 'market', 'food', 'restaurant', 'cafe',
-            'coffee', 'diner', 'dinner', 'lunch', 'breakfast', 'take-out', 'takeout',
-            'delivery', 'grubhub', 'doordash', 'ubereats', 'bakery', 'pizza'
-        ],
-        'Healthcare': [
-            'doctor', 'hospital', 'medical', 'dental', 'dentist', 'pharmacy', 'prescription',
-            'drug', 'health', 'insurance', 'therapy', 'gym', 'fitness', 'vitamin', 'eyecare',
-            'optometrist', 'eyeglasses', 'contacts'
-        ],
-        'Entertainment': [
-            'movie', 'theatre', 'theater', 'concert', 'music', 'spotify', 'netflix',
-            'hulu', 'disney', 'amazon prime', 'streaming', 'game', 'book', 'hobby',
-            'ticket', 'event', 'sports', 'subscription'
-        ],
-        'Shopping': [
-            'amazon', 'walmart', 'target', 'clothing', 'apparel', 'department', 'store',
-            'mall', 'retail', 'electronics', 'computer', 'phone', 'merchandise', 'ebay',
-            'online', 'purchase', 'shop'
-        ],
-        'Education': [
-            'school', 'university', 'college', 'tuition', 'education', 'student', 'loan',
-            'book', 'course', 'class', 'degree', 'training'
-        ],
-        'Travel': [
-            'hotel', 'airbnb', 'airline', 'flight', 'travel', 'trip', 'vacation',
-            'rental car', 'cruise', 'tour', 'booking', 'resort', 'airport'
-        ],
-        'Savings': [
-            'transfer', 'savings', 'investment', 'deposit', 'stock', 'bond', 'retirement',
-            '401k', 'ira', 'roth', 'etf', 'mutual fund'
-        ],
-        'Miscellaneous': [
-            'gift', 'donation', 'charity', 'fee', 'interest', 'tax', 'insurance',
-            'subscription', 'dues', 'membership', 'service', 'misc'
-        ]
-    }
+    incorrect_expense = positive_amounts & descriptions_lower.str.contains(EXPENSE_KEYWORDS_RE, na=False).to_numpy()
+    
+    # Apply corrections based on keywords in one pass per column; the labels are collected in
+    # arrays and written to the DataFrame once every pass has run
+    # Earlier conditions take precedence: positive amounts that look like expenses stay
+    # uncategorized for the next step, internal transfers win over Payward investments,
+    # and Payward investments win over incorrect-sign income
+    category = np.select(
+        [incorrect_expense, internal_transfer_mask, payward_transactions, incorrect_income],
+        ['Uncategorized', 'Transfer', 'Savings', 'Income'],
+        default='Uncategorized'
+    ).astype(object)
+    subcategory = np.select(
+        [internal_transfer_mask, payward_transactions],
+        ['Internal Transfer', 'Investments'],
+        default='Other'
+    ).astype(object)
+    
+    # Log sample transactions for debugging; formatting them is skipped unless debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        sample_descriptions = "\n".join(f"- '{desc}'" for desc in descriptions_lower.head(10))
+        logger.debug("Sample transaction descriptions for matching:\n%s", sample_descriptions)
+        logger.debug("Full dataframe sample:\n%s",
+                     result_df.head(10).assign(category=category[:10], subcategory=subcategory[:10]).to_string())
     
     # Detect if subcategories exist in categories
     has_subcats = all(isinstance(v, list) for v in categories.values())
     
-    # For each description, find the best matching category
-    for idx, row in result_df.iterrows():
-        # Skip if the categorization was successful via vendor matching
-        if row['category'] != 'Uncategorized':
-            continue
-        
-        # Get description for current transaction
-        desc = row['description']
-        
+    # Only transactions left uncategorized by the corrections above need matching
+    uncategorized = category == 'Uncategorized'
+    
+    if uncategorized.any():
         # Get subcategory if it exists in the input data
-        subcategory = None
         if 'subcategory' in df.columns:
-            subcategory = row.get('subcategory')
+            input_subcategories = subcategory.copy()
         elif 'Subcategory' in df.columns:
-            subcategory = df.iloc[idx].get('Subcategory')
+            input_subcategories = df['Subcategory'].to_numpy()
         elif 'raw_subcategory' in df.columns:
-            subcategory = row.get('raw_subcategory')
+            input_subcategories = df['raw_subcategory'].to_numpy()
+        else:
+            input_subcategories = np.full(len(df), None, dtype=object)
         
-        # Get amount for better categorization
-        amount = row['amount']
+        # Matching depends only on the description and subcategory, so match each
+        # distinct pair once and map the results back onto the transactions
+        pairs = pd.DataFrame({
+            'description': result_df['description'].to_numpy()[uncategorized],
+            'subcategory': input_subcategories[uncategorized]
+        })
+        pair_codes = pairs.groupby(['description', 'subcategory'], sort=False, dropna=False).ngroup().to_numpy()
+        unique_pairs = pairs.drop_duplicates()
+        unique_descriptions = unique_pairs['description']
         
         # Try to match with known vendor database first (most accurate)
-        vendor_match = match_vendor(desc, subcategory, amount)
-        if vendor_match:
-            result_df.loc[idx, 'category'] = vendor_match['category']
-            result_df.loc[idx, 'subcategory'] = vendor_match['subcategory']
-            continue
+        matched_categories, matched_subcategories = match_vendors(
+            unique_descriptions.to_numpy(), unique_pairs['subcategory'].to_numpy()
+        )
         
         # If no vendor match, use keyword-based matching as fallback
-        best_match = None
-        max_score = 0
-        
-        for category, keywords in category_keywords.items():
-            # Skip categories that don't exist in the user's categories
-            if category not in categories:
-                continue
-                
-            # Calculate match score (number of keyword matches)
-            score = sum(1 for keyword in keywords if keyword in desc)
+        # Skip categories that don't exist in the user's categories
+        category_columns = [i for i, category in enumerate(CATEGORY_KEYWORDS) if category in categories]
+        keyword_categories = [list(CATEGORY_KEYWORDS)[i] for i in category_columns]
+        unmatched = np.flatnonzero(pd.isna(matched_categories))
+        if keyword_categories and len(unmatched):
+            # Only descriptions without a vendor match are scored
+            unmatched_descriptions = unique_descriptions.iloc[unmatched]
             
-            if score > max_score:
-                max_score = score
-                best_match = category
-        
-        # Assign category if a match was found
-        if best_match and max_score > 0:
-            result_df.iloc[idx, result_df.columns.get_loc('category')] = best_match
+            # Scan for each distinct keyword of those categories once
+            keyword_membership = CATEGORY_KEYWORD_MEMBERSHIP[:, category_columns]
+            used_keywords = keyword_membership.any(axis=1)
+            keyword_hits = np.column_stack([
+                unmatched_descriptions.str.contains(keyword, regex=False).to_numpy(dtype=np.int32)
+                for keyword, used in zip(CATEGORY_KEYWORD_LIST, used_keywords) if used
+            ])
             
-            # Try to find a matching subcategory
-            if has_subcats:
-                subcats = categories.get(best_match, [])
-                best_subcat = None
-                max_subscore = 0
-                
-                for subcat in subcats:
-                    subcat_lower = subcat.lower()
-                    if subcat_lower in desc:
-                        # Direct match
-                        best_subcat = subcat
-                        break
-                    else:
-                        # Partial match score
-                        words = set(subcat_lower.split())
-                        desc_words = set(desc.split())
-                        overlap = len(words.intersection(desc_words))
-                        if overlap > max_subscore:
-                            max_subscore = overlap
-                            best_subcat = subcat
+            # Calculate match scores (number of keyword matches) for every category at once
+            scores = keyword_hits @ keyword_membership[used_keywords]
+            best_matches = scores.argmax(axis=1)
+            has_keyword_match = scores.max(axis=1) > 0
+            
+            for i, desc, best_category, has_match in zip(unmatched, unmatched_descriptions, best_matches, has_keyword_match):
+                # Assign category if a match was found
+                if not has_match:
+                    continue
+                best_match = keyword_categories[best_category]
+                matched_categories[i] = best_match
                 
-                if best_subcat:
-                    result_df.iloc[idx, result_df.columns.get_loc('subcategory')] = best_subcat
-                elif subcats:
-                    # Default to first subcategory
-                    result_df.iloc[idx, result_df.columns.get_loc('subcategory')] = subcats[0]
+                # Try to find a matching subcategory
+                if has_subcats:
+                    matched_subcategories[i] = find_best_subcategory(desc, categories.get(best_match, []))
+        
+        # Map the matched categories back onto the transactions
+        matched_categories = matched_categories[pair_codes]
+        matched_subcategories = matched_subcategories[pair_codes]
+        
+        category_rows = uncategorized.copy()
+        category_rows[uncategorized] = pd.notna(matched_categories)
+        category[category_rows] = matched_categories[pd.notna(matched_categories)]
+        
+        subcategory_rows = uncategorized.copy()
+        subcategory_rows[uncategorized] = pd.notna(matched_subcategories)
+        subcategory[subcategory_rows] = matched_subcategories[pd.notna(matched_subcategories)]
     
     # Final pass: Any remaining uncategorized positive amounts should be marked as income
-    remaining_uncategorized = (result_df['category'] == 'Uncategorized') & (result_df['amount'] > 0)
-    result_df.loc[remaining_uncategorized, 'category'] = 'Income'
-    result_df.loc[remaining_uncategorized, 'subcategory'] = 'Other Income'
+    remaining_uncategorized = (category == 'Uncategorized') & positive_amounts
+    category[remaining_uncategorized] = 'Income'
+    subcategory[remaining_uncategorized] = 'Other Income'
     
+    # Store the labels as categoricals so later comparisons and groupbys work on integer codes
+    result_df['category'] = pd.Categorical(category)
+    result_df['subcategory'] = pd.Categorical(subcategory)
     return result_df
 
+def categorization_inputs(categories):
+    """
+    Collect the parts of a categories dictionary that categorize_transactions depends on.
+    
+    Args:
+        categories: Dictionary mapping categories to lists of keywords/subcategories
+    
+    Returns:
+        Hashable tuple that differs between two dictionaries only if they can categorize transactions differently
+    """
+    has_subcats = all(isinstance(v, list) for v in categories.values())
+    keyword_categories = tuple(
+        (category, tuple(categories[category]) if has_subcats else None)
+        for category in CATEGORY_KEYWORDS if category in categories
+    )
+    return has_subcats, keyword_categories
+
+@lru_cache(maxsize=None)
+def subcategory_words(subcategory):
+    """
+    Lowercase a subcategory name and split it into words, once per distinct name.
+    
+    Args:
+        subcategory: Subcategory name
+    
+    Returns:
+        Tuple of the lowercased name and the frozenset of its words
+    """
+    subcat_lower = subcategory.lower()
+    return subcat_lower, frozenset(subcat_lower.split())
+
+def find_best_subcategory(description, subcategories):
+    """
+    Pick the subcategory that best matches a transaction description.
+    
+    Args:
+        description: Transaction description string
+        subcategories: List of subcategories of the matched category
+    
+    Returns:
+        Best matching subcategory, the first subcategory if none match, or None if there are none
+    """
+    subcategory_info = [(subcat, *subcategory_words(subcat)) for subcat in subcategories]
+    
+    # A direct match wins over any partial match
+    for subcat, subcat_lower, _ in subcategory_info:
+        if subcat_lower in description:
+            return subcat
+    
+    # Partial match score
+    best_subcat = None
+    max_subscore = 0
+    desc_words = set(description.split())
+    for subcat, _, words in subcategory_info:
+        overlap = len(words.intersection(desc_words))
+        if overlap > max_subscore:
+            max_subscore = overlap
+            best_subcat = subcat
+    
+    if best_subcat:
+        return best_subcat
+    elif subcategories:
+        # Default to first subcategory
+        return subcategories[0]
+    return None
+
 def calculate_summary(df):
     """
     Calculate financial summary statistics from transaction data.
@@ -258,30 +342,31 @@ def calculate_summary(df):
     income_df = df[income_mask]
     
     # For income transactions with negative values, convert to positive
-    income_df.loc[income_df['amount'] < 0, 'amount'] = income_df.loc[income_df['amount'] < 0, 'amount'].abs()
+    income_df = income_df.assign(amount=income_df['amount'].abs())
     
     # Calculate total income
     total_income = income_df['amount'].sum()
     
     # Special handling for transfer categories (like Investment transfers and Internal Transfers)
-    payward_mask = df['description'].str.lower().str.contains('payward')
+    # On categorical descriptions the str methods run once per distinct description
+    payward_mask = df['description'].str.lower().str.contains('payward', regex=False, na=False)
     transfer_mask = df['category'] == 'Transfer'
     
-    # Separate out internal bank transfers
-    transfer_df = df[transfer_mask].copy()
-    
-    # Separate out investment transfers like Payward
-    investment_df = df[payward_mask].copy()
-    
     # Remaining transactions (non-income, non-transfer, non-payward) are regular expenses
-    expense_df = df[~income_mask & ~transfer_mask & ~payward_mask]
+    regular_expense_mask = ~income_mask & ~transfer_mask & ~payward_mask
+    
+    # Combine all non-income transactions (expenses, then internal bank transfers, then
+    # investment transfers like Payward) with a single row selection
+    positions = np.concatenate([
+        np.flatnonzero(regular_expense_mask), np.flatnonzero(transfer_mask), np.flatnonzero(payward_mask)
+    ])
+    amounts = df['amount'].to_numpy()[positions]
     
     # Make sure all expenses are negative
     # For expense transactions with positive values, convert to negative
-    expense_df.loc[expense_df['amount'] > 0, 'amount'] = -expense_df.loc[expense_df['amount'] > 0, 'amount']
-    
-    # Combine all non-income dataframes (expenses, transfers, investments)
-    expense_df = pd.concat([expense_df, transfer_df, investment_df])
+    n_regular = int(regular_expense_mask.sum())
+    amounts[:n_regular] = -np.abs(amounts[:n_regular])
+    expense_df = df.iloc[positions].assign(amount=amounts)
     
     # Calculate total expenses (always positive for display)
     total_expenses = abs(expense_df['amount'].sum())
@@ -293,25 +378,28 @@ def calculate_summary(df):
     savings_rate = (net_savings / total_income * 100) if total_income > 0 else 0
     
     # Calculate expense by category
-    expense_by_category = expense_df.groupby('category')['amount'].sum().abs().to_dict()
+    category_expenses = expense_df.groupby('category', observed=True)['amount'].sum().abs()
+    expense_by_category = category_expenses.to_dict()
     
     # Calculate income breakdown by subcategory
-    income_by_subcategory = income_df.groupby('subcategory')['amount'].sum().to_dict()
+    subcategory_income = income_df.groupby('subcategory', observed=True)['amount'].sum()
+    income_by_subcategory = subcategory_income.to_dict()
     
     # Calculate monthly net
-    df['month'] = df['date'].dt.to_period('M')
-    monthly_net = df.groupby('month')['amount'].sum().to_dict()
-    # Convert period index to string for JSON serialization
-    monthly_net = {str(k): float(v) for k, v in monthly_net.items()}
+    # Truncating the dates to month precision groups on integer datetimes instead of Period objects
+    months = df['date'].to_numpy().astype('datetime64[M]')
+    monthly_net = df['amount'].groupby(months).sum()
+    # Convert month index to string for JSON serialization
+    monthly_net = {k: float(v) for k, v in zip(monthly_net.index.strftime('%Y-%m'), monthly_net.to_numpy())}
     
     # Get top categories for expenses
-    top_expense_category = max(expense_by_category.items(), key=lambda x: x[1])[0] if expense_by_category else None
+    top_expense_category = category_expenses.idxmax() if not category_expenses.empty else None
     
     # Create income by main category too for backwards compatibility
     income_by_category = {"Income": total_income}
     
     # Get top income subcategory
-    top_income_subcategory = max(income_by_subcategory.items(), key=lambda x: x[1])[0] if income_by_subcategory else None
+    top_income_subcategory = subcategory_income.idxmax() if not subcategory_income.empty else None
     top_income_category = "Income"  # For backwards compatibility
     
     # Create a breakdown of transactions by type (income vs expense)
@@ -321,17 +409,20 @@ def calculate_summary(df):
     }
     
     # Create a list of transactions marked as income and expense
-    income_transactions = income_df[['date', 'description', 'amount', 'subcategory']].sort_values('amount', ascending=False).head(10).to_dict('records')
-    expense_transactions = expense_df[['date', 'description', 'amount', 'category', 'subcategory']].sort_values('amount').head(10).to_dict('records')
-    
-    # Convert date objects to strings for JSON serialization
-    for tx in income_transactions:
-        tx['date'] = tx['date'].strftime('%Y-%m-%d') if pd.notnull(tx['date']) else None
-        tx['amount'] = float(tx['amount'])
-    
-    for tx in expense_transactions:
-        tx['date'] = tx['date'].strftime('%Y-%m-%d') if pd.notnull(tx['date']) else None
-        tx['amount'] = float(abs(tx['amount']))  # Make positive for display
+    # nlargest/nsmallest select the top 10 without sorting every transaction
+    # Carry the precomputed display dates along, when present, so tables needn't re-format them
+    date_columns = ['date', 'date_str'] if 'date_str' in df.columns else ['date']
+    income_top = income_df.nlargest(10, 'amount')[date_columns + ['description', 'amount', 'subcategory']]
+    expense_top = expense_df.nsmallest(10, 'amount')[date_columns + ['description', 'amount', 'category', 'subcategory']]
+    
+    # Format dates as strings for JSON serialization, with missing dates as None
+    income_transactions = income_top.assign(
+        date=income_top['date'].dt.strftime('%Y-%m-%d').astype(object).where(income_top['date'].notna(), None)
+    ).to_dict('records')
+    expense_transactions = expense_top.assign(
+        date=expense_top['date'].dt.strftime('%Y-%m-%d').astype(object).where(expense_top['date'].notna(), None),
+        amount=expense_top['amount'].abs()  # Make positive for display
+    ).to_dict('records')
     
     return {
         'total_income': float(total_income),
@@ -1,8 +1,150 @@
+import numpy as np
 import pandas as pd
 import tabula
 import io
+import os
 import re
+import shutil
+import tempfile
 from datetime import datetime
+from utils.vendor_database import keyword_pattern
+
+# Number of rows inspected when guessing what a column contains
+SNIFF_N = 1000
+
+# Bytes at the start of a CSV searched for a known bank header line, past any preamble
+CSV_HEADER_SCAN_BYTES = 1024
+
+# Columns of the Barclays CSV export, in order
+BARCLAYS_COLUMNS = ['Number', 'Date', 'Account', 'Amount', 'Subcategory', 'Memo']
+
+# Column types of the Barclays CSV export (Number,Date,Account,Amount,Subcategory,Memo)
+BARCLAYS_DTYPES = {
+    'Number': 'string',  # unused, and often a blank space in Barclays exports
+    'Account': 'string',
+    'Amount': 'float64',
+    'Subcategory': 'category',
+    'Memo': 'string'
+}
+
+# tabula settings tried in order until one finds tables: default, lattice, then stream mode
+PDF_READ_OPTIONS = [
+    {},
+    {'guess': True, 'lattice': True},
+    {'stream': True, 'guess': False}
+]
+
+# Keywords that identify columns by name, each list matched in a single regex scan
+CSV_DATE_COLUMN_RE = keyword_pattern(['date', 'time', 'day', 'post', 'memo', 'transaction date'])
+CSV_DESCRIPTION_COLUMN_RE = keyword_pattern(['desc', 'narrative', 'details', 'transaction', 'merchant', 'payee', 'name', 'memo', 'description'])
+CSV_AMOUNT_COLUMN_RE = keyword_pattern(['amount', 'sum', 'value', 'debit', 'credit', 'balance'])
+CSV_DEBIT_COLUMN_RE = keyword_pattern(['debit', 'withdrawal', 'expense', 'payment', 'out'])
+CSV_CREDIT_COLUMN_RE = keyword_pattern(['credit', 'deposit', 'income', 'received', 'in'])
+PDF_DATE_COLUMN_RE = keyword_pattern(['date', 'time', 'day', 'posting date', 'trans date', 'post', 'memo', 'transaction date'])
+PDF_DESCRIPTION_COLUMN_RE = keyword_pattern(['desc', 'narrative', 'details', 'transaction', 'merchant', 'payee', 'name', 'reference', 'memo', 'description'])
+PDF_AMOUNT_COLUMN_RE = keyword_pattern(['amount', 'sum', 'value', 'debit', 'credit', 'balance', 'withdrawal', 'deposit'])
+PDF_DEBIT_COLUMN_RE = keyword_pattern(['debit', 'payment', 'withdrawal'])
+PDF_CREDIT_COLUMN_RE = keyword_pattern(['credit', 'deposit', 'received'])
+# Exact (lowercased) names of columns holding the bank's own subcategory
+SUBCATEGORY_COLUMN_NAMES = frozenset(['subcategory', 'subcat', 'category', 'type', 'transaction type'])
+
+# Characters stripped from amount strings, removed with str.translate (no regex needed)
+CURRENCY_TRANS = str.maketrans('', '', '$£€,')
+AMOUNT_STRIP_TRANS = str.maketrans('', '', ',$ \t\n\r\f\v\xa0')
+AMOUNT_SYMBOLS_TRANS = str.maketrans('', '', ',$()+-')
+AMOUNT_STRIP_PARENS_TRANS = str.maketrans('', '', ',$ \t\n\r\f\v\xa0()')
+
+# Patterns used to clean amount and date columns, compiled once per process
+PAREN_NEGATIVE_RE = re.compile(r'\((.+)\)')
+NON_DATE_CHARS_RE = re.compile(r'[^\d/\-\s\w]')
+UK_DATE_RE = re.compile(r'(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)', re.IGNORECASE)
+UK_DATE_PREFIX_RE = re.compile(r'\d{1,2}\s+[A-Za-z]{3}')
+DATE_PATTERNS = [
+    re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}'),  # MM/DD/YYYY or DD/MM/YYYY
+    re.compile(r'\d{1,2}-\d{1,2}-\d{2,4}'),  # MM-DD-YYYY or DD-MM-YYYY
+    re.compile(r'\d{2,4}-\d{1,2}-\d{1,2}'),  # YYYY-MM-DD
+    re.compile(r'\d{1,2}\s[A-Za-z]{3}\s\d{2,4}'),  # DD MMM YYYY
+    re.compile(r'\d{1,2}\s[A-Za-z]{3}')  # DD MMM (without year)
+]
+# Any of the date patterns above, so a column can be checked in one scan
+ANY_DATE_RE = re.compile('|'.join(pattern.pattern for pattern in DATE_PATTERNS))
+# pd.api.types.infer_dtype results for columns that cannot hold date text
+NUMERIC_INFERRED_TYPES = ('integer', 'floating', 'mixed-integer-float', 'decimal')
+
+# Day-first date formats tried before falling back to pandas' general date parsing
+DAYFIRST_DATE_FORMATS = ['%d/%m/%Y', '%d/%m/%y', '%d-%m-%Y', '%Y-%m-%d', '%d %b %Y']
+
+# Patterns used by clean_description, compiled once per process
+BANK_CODE_SUFFIX_RE = re.compile(r'\b(DDR|BGC|CBP|BCC|CPM|BP|SO|DD|FT)$')
+ON_DATE_RE = re.compile(r'ON\s+\d+\s+[A-Z]{3}')
+BUPA_DIRECT_DEBIT_RE = re.compile(r'Direct\s+Debit\s+to\s+BUPA', re.IGNORECASE)
+DIRECT_DEBIT_PAYEE_RE = re.compile(r'Direct\s+Debit\s+to\s+([A-Za-z0-9\s&]+)', re.IGNORECASE)
+PAYMENT_PAYEE_RE = re.compile(r'(Payment|Transfer)\s+to\s+([A-Za-z0-9\s&]+)', re.IGNORECASE)
+REFERENCE_NAME_RE = re.compile(r'Ref:\s*([A-Za-z0-9\s&]+)', re.IGNORECASE)
+NAME_LIKE_RE = re.compile(r'[A-Za-z]{3,}')
+REFERENCE_NUMBER_RE = re.compile(r'\b(REF|ID|TRXN|TRAN|TRANS|TRN)[\s#:]*\d+\b', re.IGNORECASE)
+LONG_NUMBER_RE = re.compile(r'\b\d{5,}\b')
+TYPE_INDICATOR_RE = re.compile(
+    r'\b(?:PURCHASE|PAYMENT|TRANSFER|FEE|INTEREST|DEPOSIT|WITHDRAWAL|REFUND|REVERSAL|CHARGE|CREDIT|DEBIT|TRANSACTION)\b',
+    re.IGNORECASE
+)
+
+# Transaction-type prefixes stripped from descriptions, checked in this order
+DESCRIPTION_PREFIXES = (
+    'PAYMENT TO ', 'PAYMENT FROM ', 'PURCHASE AT ', 'POS PURCHASE ', 
+    'DEPOSIT AT ', 'ATM ', 'CHQ ', 'CHEQUE ', 'DIRECT DEPOSIT ', 
+    'ACH ', 'CREDIT ', 'DEBIT ', 'DIRECT DEBIT TO '
+)
+
+# Merchants recognised in cleaned descriptions, in priority order
+MERCHANT_PATTERNS = [
+    # Credit cards
+    ('American Express', r'AMEX|American Express'),
+    ('Credit Card Payment', r'VISA|MASTERCARD|CREDIT CARD PMT'),
+    # Common retailers
+    ('Amazon', r'AMAZON|AMZN'),
+    ('Tesco', r'TESCO'),
+    ("Sainsbury's", r'SAINSBURY'),
+    ('Asda', r'ASDA'),
+    ('Aldi', r'ALDI'),
+    ('Lidl', r'LIDL'),
+    ('Morrisons', r'MORRISONS'),
+    ('Waitrose', r'WAITROSE'),
+    ('IKEA', r'IKEA'),
+    # Utilities and services
+    ('Netflix', r'NETFLIX'),
+    ('Spotify', r'SPOTIFY'),
+    ('British Gas', r'BRITISH GAS|BRITISHGAS'),
+    ('EDF Energy', r'EDF|E\.D\.F'),
+    ('Thames Water', r'THAMES WATER|THAMESWATER'),
+    ('TV License', r'TV LICENSE|TVLICENSE'),
+    ('Sky', r'(?<![A-Z])SKY(?![A-Z])'),
+    ('Virgin Media', r'VIRGIN MEDIA|VIRGINMEDIA'),
+    ('BT', r'BT GROUP|BTGROUP|BT\.COM')
+]
+# One regex that tries each merchant in turn (each as a lookahead over the whole string),
+# so the first merchant in the list wins, as it would with one search per merchant
+MERCHANT_RE = re.compile(
+    '|'.join(f'(?=.*?(?:{pattern}))(?P<m{i}>)' for i, (_, pattern) in enumerate(MERCHANT_PATTERNS)),
+    re.IGNORECASE | re.DOTALL
+)
+MERCHANT_LABELS = {f'm{i}': label for i, (label, _) in enumerate(MERCHANT_PATTERNS)}
+
+def csv_header_key(line):
+    """
+    Normalise a CSV header line for lookup in CSV_HEADER_PARSERS.
+    
+    Args:
+        line: Header line text
+    
+    Returns:
+        The header's fields, stripped of whitespace and without trailing empty fields,
+        joined by commas
+    """
+    fields = [field.strip() for field in line.split(',')]
+    while fields and not fields[-1]:
+        fields.pop()
+    return ','.join(fields)
 
 def parse_csv(file):
     """
@@ -15,31 +157,24 @@ def parse_csv(file):
         DataFrame with standardized columns
     """
     try:
-        # Check if this is a Barclays CSV format by reading the first few lines
+        # Known bank exports are recognised by their header line, which may follow a preamble
         file.seek(0)
-        header = file.read(1024).decode('utf-8')
+        head = file.read(CSV_HEADER_SCAN_BYTES)
         file.seek(0)
         
-        # Barclays CSV typically has: Number,Date,Account,Amount,Subcategory,Memo
-        if 'Number,Date,Account,Amount,Subcategory,Memo' in header:
-            # Special handling for Barclays CSV format
-            df = pd.read_csv(file)
-            
-            # Standardize the column names
-            standardized_df = pd.DataFrame()
-            standardized_df['date'] = pd.to_datetime(df['Date'], format='%d/%m/%Y', errors='coerce')
-            standardized_df['description'] = df['Memo'].apply(clean_description)
-            standardized_df['amount'] = df['Amount'].astype(float)
-            standardized_df['raw_description'] = df['Memo']
-            standardized_df['subcategory'] = df['Subcategory']  # Keep original subcategory for reference
-            standardized_df['raw_subcategory'] = df['Subcategory']  # Store the raw subcategory for debugging
-            
-            # Return the standardized DataFrame
-            return standardized_df
-            
-        # If not a Barclays format, proceed with the general approach
+        offset = 0
+        for line in head.splitlines(keepends=True):
+            bank_parser = CSV_HEADER_PARSERS.get(csv_header_key(line.decode('utf-8-sig', errors='replace')))
+            if bank_parser:
+                # Hand the parser the file positioned at the header line
+                file.seek(offset)
+                return bank_parser(file)
+            offset += len(line)
+            
+        # If not a known bank format, proceed with the general approach
+        # Work out the column layout from the first rows only
         file.seek(0)
-        df = pd.read_csv(file)
+        df = pd.read_csv(file, nrows=SNIFF_N)
         
         # Try to identify date, description, and amount columns
         date_columns = []
@@ -50,15 +185,21 @@ def parse_csv(file):
         for col in df.columns:
             col_lower = col.lower()
             # Date column detection - including memo and posted date keywords
-            if any(keyword in col_lower for keyword in ['date', 'time', 'day', 'post', 'memo', 'transaction date']):
+            if CSV_DATE_COLUMN_RE.search(col_lower):
                 date_columns.append(col)
             # Description column detection
-            elif any(keyword in col_lower for keyword in ['desc', 'narrative', 'details', 'transaction', 'merchant', 'payee', 'name', 'memo', 'description']):
+            elif CSV_DESCRIPTION_COLUMN_RE.search(col_lower):
                 description_columns.append(col)
             # Amount column detection
-            elif any(keyword in col_lower for keyword in ['amount', 'sum', 'value', 'debit', 'credit', 'balance']):
+            elif CSV_AMOUNT_COLUMN_RE.search(col_lower):
                 amount_columns.append(col)
         
+        # Look up each column's dtype kind once for the type checks below
+        kinds = {col: dtype.kind for col, dtype in df.dtypes.items()}
+        
+        # Numeric conversions of candidate amount columns, shared by the checks below
+        converted_amounts = {}
+        
         # If we couldn't identify all columns, try a different approach
         if not (date_columns and description_columns and amount_columns):
             # Check column data types
@@ -78,13 +219,13 @@ def parse_csv(file):
                         pass
                 
                 # Check if column could be a description (string)
-                if not description_columns and df[col].dtype == 'object':
+                if not description_columns and kinds[col] == 'O':
                     # If most values have more than 10 characters, it's likely a description
                     if sample.str.len().mean() > 10:
                         description_columns.append(col)
                 
                 # Check if column could be an amount (numeric)
-                if df[col].dtype in ['float64', 'int64', 'float32', 'int32']:
+                if kinds[col] in 'iuf':
                     # Look for columns that contain currency values
                     # Most transaction amounts should have decimal places
                     sample_values = df[col].dropna().head(50)
@@ -104,34 +245,33 @@ def parse_csv(file):
             date_columns = [df.columns[0]]
         
         if not description_columns:
-            # Look for the column with the longest string values
-            str_lengths = {col: df[col].astype(str).str.len().mean() for col in df.columns}
-            description_columns = [max(str_lengths.items(), key=lambda x: x[1])[0]]
+            # Look for the column with the longest string values (judged on the first rows)
+            description_columns = [max(df.columns, key=lambda col: mean_text_length(df[col].head(SNIFF_N)))]
         
         if not amount_columns or len(amount_columns) > 3:
             # Look for columns that look like amounts (with decimals, currencies, etc.)
             potential_amount_cols = []
             for col in df.columns:
-                if pd.api.types.is_numeric_dtype(df[col]) and col not in date_columns:
+                if kinds[col] in 'biufc' and col not in date_columns:
                     potential_amount_cols.append(col)
-                elif df[col].dtype == 'object':
+                elif kinds[col] == 'O':
                     # For string columns, check if they can be converted to numbers after cleaning
-                    sample = df[col].dropna().astype(str).head(20)
+                    sample = df[col].dropna().head(SNIFF_N)
                     # Remove currency symbols, commas, etc.
-                    cleaned = sample.str.replace(r'[$£€,]', '', regex=True)
+                    cleaned = sample.astype(str).str.translate(CURRENCY_TRANS)
                     # Check if it can be converted to numeric
                     numeric_values = pd.to_numeric(cleaned, errors='coerce')
-                    if numeric_values.notna().sum() > len(sample) * 0.7:  # If more than 70% can be converted
+                    if numeric_values.notna().mean() > 0.7:  # If more than 70% can be converted
                         potential_amount_cols.append(col)
+                        converted_amounts[col] = numeric_values
             
             # Filter columns by looking at the distribution of values
             filtered_amount_cols = []
             for col in potential_amount_cols:
-                # Convert to numeric if needed
-                if df[col].dtype == 'object':
-                    values = pd.to_numeric(df[col].astype(str).str.replace(r'[$£€,]', '', regex=True), errors='coerce')
-                else:
-                    values = df[col]
+                # String columns were already converted on a sample above
+                if col not in converted_amounts:
+                    converted_amounts[col] = df[col].dropna().head(SNIFF_N)
+                values = converted_amounts[col]
                 
                 # Check if the column has a reasonable range of values for amounts
                 if values.notna().any():
@@ -149,6 +289,24 @@ def parse_csv(file):
         date_col = date_columns[0]
         description_col = description_columns[0]
         
+        # Also check if there's a subcategory column in the original data
+        subcategory_col = None
+        for col in df.columns:
+            if col.lower() in SUBCATEGORY_COLUMN_NAMES:
+                subcategory_col = col
+                break
+        
+        # Read the whole statement, keeping only the columns that can be used
+        needed_cols = [date_col, description_col, *amount_columns]
+        if subcategory_col:
+            needed_cols.append(subcategory_col)
+        file.seek(0)
+        df = pd.read_csv(file, usecols=list(dict.fromkeys(needed_cols)))
+        # Convert the date and description columns once; every layout below builds
+        # its result from these arrays, so the frames share the same buffers
+        dates = to_datetime_dayfirst(df[date_col]).to_numpy()
+        descriptions = df[description_col].astype(str).to_numpy()
+        
         # For amount, we need to handle different bank formats
         # Some banks use separate debit/credit columns, others use a single amount column
         
@@ -156,23 +314,16 @@ def parse_csv(file):
         if len(amount_columns) == 1:
             amount_col = amount_columns[0]
             # Create a raw_description column to preserve original text
-            # Also check if there's a subcategory column in the original data
-            subcategory_col = None
-            for col in df.columns:
-                if col.lower() in ['subcategory', 'subcat', 'category', 'type', 'transaction type']:
-                    subcategory_col = col
-                    break
-                    
             result_df = pd.DataFrame({
-                'date': pd.to_datetime(df[date_col], errors='coerce', dayfirst=True),
-                'description': df[description_col].astype(str),
-                'amount': df[amount_col],
-                'raw_description': df[description_col].astype(str)  # Keep original description
-            })
+                'date': dates,
+                'description': descriptions,
+                'amount': df[amount_col].to_numpy(),
+                'raw_description': descriptions  # Keep original description
+            }, copy=False)
             
             # Add subcategory column if it exists
             if subcategory_col:
-                result_df['subcategory'] = df[subcategory_col]
+                result_df['subcategory'] = pd.Categorical(df[subcategory_col])
         
         # Case 2: Separate debit and credit columns
         elif len(amount_columns) >= 2:
@@ -182,9 +333,9 @@ def parse_csv(file):
             
             for col in amount_columns:
                 col_lower = str(col).lower()
-                if any(keyword in col_lower for keyword in ['debit', 'withdrawal', 'expense', 'payment', 'out']):
+                if CSV_DEBIT_COLUMN_RE.search(col_lower):
                     debit_col = col
-                elif any(keyword in col_lower for keyword in ['credit', 'deposit', 'income', 'received', 'in']):
+                elif CSV_CREDIT_COLUMN_RE.search(col_lower):
                     credit_col = col
             
             # If we couldn't identify by names, try to infer from data patterns
@@ -193,11 +344,14 @@ def parse_csv(file):
                 column_stats = {}
                 for col in amount_columns:
                     # Count positive, negative and zero values in each column
-                    if df[col].dtype == 'object':
+                    if col in converted_amounts:
+                        values = converted_amounts[col]
+                    elif kinds[col] == 'O':
                         # Try to convert string values to numeric
-                        values = pd.to_numeric(df[col].astype(str).str.replace(r'[$£€,]', '', regex=True), errors='coerce')
+                        sample = df[col].dropna().head(SNIFF_N)
+                        values = pd.to_numeric(sample.astype(str).str.translate(CURRENCY_TRANS), errors='coerce')
                     else:
-                        values = df[col]
+                        values = df[col].dropna().head(SNIFF_N)
                     
                     if values.notna().any():
                         pos_count = (values > 0).sum()
@@ -231,10 +385,10 @@ def parse_csv(file):
                         # Use this as a single amount column instead
                         amount_col = credit_candidates[0][0]
                         result_df = pd.DataFrame({
-                            'date': pd.to_datetime(df[date_col], errors='coerce', dayfirst=True),
-                            'description': df[description_col].astype(str),
-                            'amount': df[amount_col]
-                        })
+                            'date': dates,
+                            'description': descriptions,
+                            'amount': df[amount_col].to_numpy()
+                        }, copy=False)
                         return result_df
                     else:
                         credit_col = credit_candidates[0][0]
@@ -251,49 +405,35 @@ def parse_csv(file):
             
             # Create a combined amount column (credit positive, debit negative)
             # Convert columns to numeric first to ensure proper calculation
-            credit_values = pd.to_numeric(df[credit_col].astype(str).str.replace(r'[$£€,]', '', regex=True), errors='coerce').fillna(0)
-            debit_values = pd.to_numeric(df[debit_col].astype(str).str.replace(r'[$£€,]', '', regex=True), errors='coerce').fillna(0)
+            credit_values = pd.to_numeric(df[credit_col].astype(str).str.translate(CURRENCY_TRANS), errors='coerce').fillna(0).to_numpy()
+            debit_values = pd.to_numeric(df[debit_col].astype(str).str.translate(CURRENCY_TRANS), errors='coerce').fillna(0).to_numpy()
             
             # Make sure debit values are negative for consistent representation
-            debit_values = -1 * debit_values.abs()
-            
-            # Combine values (credit is positive, debit is negative)
-            df['combined_amount'] = credit_values + debit_values
+            debit_values = -np.abs(debit_values)
             
-            # When one column is 0 and the other has a value, use that value
-            df.loc[credit_values != 0, 'combined_amount'] = credit_values
-            df.loc[debit_values != 0, 'combined_amount'] = debit_values
+            # Use the debit where there is one, otherwise the credit
+            combined_amount = np.where(debit_values != 0, debit_values, credit_values)
             
-            # Also check if there's a subcategory column in the original data
-            subcategory_col = None
-            for col in df.columns:
-                if col.lower() in ['subcategory', 'subcat', 'category', 'type', 'transaction type']:
-                    subcategory_col = col
-                    break
-                    
             result_df = pd.DataFrame({
-                'date': pd.to_datetime(df[date_col], errors='coerce', dayfirst=True),
-                'description': df[description_col].astype(str),
-                'amount': df['combined_amount'],
-                'raw_description': df[description_col].astype(str)  # Keep original description
-            })
+                'date': dates,
+                'description': descriptions,
+                'amount': combined_amount,
+                'raw_description': descriptions  # Keep original description
+            }, copy=False)
             
             # Add subcategory column if it exists
             if subcategory_col:
-                result_df['subcategory'] = df[subcategory_col]
+                result_df['subcategory'] = pd.Categorical(df[subcategory_col])
         
         # Clean up the data
-        # Remove rows with invalid dates
-        result_df = result_df.dropna(subset=['date'])
-        
-        # Clean description
-        result_df['description'] = result_df['description'].apply(lambda x: clean_description(x))
-        
         # Ensure amount is numeric
         result_df['amount'] = pd.to_numeric(result_df['amount'], errors='coerce')
         
-        # Drop rows with missing amounts
-        result_df = result_df.dropna(subset=['amount'])
+        # Remove rows with invalid dates or missing amounts in a single selection
+        result_df = result_df[(result_df['date'].notna() & result_df['amount'].notna()).to_numpy()]
+        
+        # Clean description once, only for the rows that are kept
+        result_df = result_df.assign(description=clean_description_series(result_df['description']))
         
         return result_df
     
@@ -301,6 +441,7 @@ def parse_csv(file):
         # If automatic parsing fails, try a more generic approach
         try:
             # Just read the CSV without assumptions
+            file.seek(0)
             df = pd.read_csv(file)
             
             # Let the user know about the issue
@@ -311,6 +452,42 @@ def parse_csv(file):
         except:
             raise Exception(f"Failed to parse CSV file: {str(e)}")
 
+def parse_barclays_csv(file):
+    """
+    Parse a Barclays CSV export (Number,Date,Account,Amount,Subcategory,Memo).
+    
+    Args:
+        file: CSV file upload object, positioned at the header line
+    
+    Returns:
+        DataFrame with standardized columns
+    """
+    # The layout is fixed, so give the parser the column names, types and date format up front.
+    # The header's own names are replaced, so stray whitespace in them doesn't matter, and
+    # index_col=False drops the empty field a trailing comma adds to each row.
+    df = pd.read_csv(file, header=0, names=BARCLAYS_COLUMNS, index_col=False,
+                     dtype=BARCLAYS_DTYPES, parse_dates=['Date'], date_format='%d/%m/%Y')
+    
+    # Standardize the column names
+    standardized_df = pd.DataFrame()
+    if pd.api.types.is_datetime64_any_dtype(df['Date']):
+        standardized_df['date'] = df['Date']
+    else:
+        # Some dates did not match the format, so the parser left them as text
+        standardized_df['date'] = cached_to_datetime(df['Date'], '%d/%m/%Y')
+    standardized_df['description'] = clean_description_series(df['Memo'])
+    standardized_df['amount'] = df['Amount']
+    standardized_df['raw_description'] = df['Memo']
+    standardized_df['subcategory'] = df['Subcategory']  # Keep original subcategory for reference
+    standardized_df['raw_subcategory'] = df['Subcategory']  # Store the raw subcategory for debugging
+    
+    return standardized_df
+
+# Parsers for bank exports with a fixed layout, keyed by their header line as normalised by csv_header_key
+CSV_HEADER_PARSERS = {
+    'Number,Date,Account,Amount,Subcategory,Memo': parse_barclays_csv
+}
+
 def parse_pdf(file):
     """
     Parse a PDF bank statement into a standardized DataFrame.
@@ -323,46 +500,41 @@ def parse_pdf(file):
     """
     try:
         # Read PDF tables
-        # Convert the uploaded file to bytes for tabula to read
-        file_bytes = io.BytesIO(file.read())
+        # tabula copies file-like input to a temporary file on every call, so give it a
+        # path instead: the file's own path if it is a file opened from disk, otherwise one
+        # copy we write here. An upload's name is only the client's filename, not a server path.
+        temp_path = None
+        if isinstance(file, (io.BufferedReader, io.FileIO)) and os.path.isfile(file.name):
+            pdf_path = file.name
+        else:
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
+                file.seek(0)
+                shutil.copyfileobj(file, temp_file)
+            pdf_path = temp_path = temp_file.name
         
-        # Try to extract tables with multiple settings to maximize success
         try:
-            # First attempt with default settings
-            tables = tabula.read_pdf(file_bytes, pages='all', multiple_tables=True)
-            
-            # If no tables found, try with different area settings
-            if not tables:
-                print("Trying alternate PDF parsing settings...")
-                file_bytes.seek(0)  # Reset file pointer
-                tables = tabula.read_pdf(
-                    file_bytes, 
-                    pages='all', 
-                    multiple_tables=True,
-                    guess=True,
-                    lattice=True
-                )
-            
-            # If still no tables, try with stream mode
-            if not tables:
-                file_bytes.seek(0)
+            # Try to extract tables with multiple settings to maximize success
+            try:
+                tables = []
+                for attempt, options in enumerate(PDF_READ_OPTIONS):
+                    # If no tables were found, try the next settings
+                    if attempt:
+                        print("Trying alternate PDF parsing settings...")
+                    tables = tabula.read_pdf(pdf_path, pages='all', multiple_tables=True, **options)
+                    if tables:
+                        break
+                    
+            except Exception as parse_error:
+                print(f"PDF parsing error: {str(parse_error)}")
+                # Last resort: try with minimal settings
                 tables = tabula.read_pdf(
-                    file_bytes, 
-                    pages='all', 
-                    multiple_tables=True,
-                    stream=True,
-                    guess=False
+                    pdf_path, 
+                    pages='all',
+                    silent=True
                 )
-                
-        except Exception as parse_error:
-            print(f"PDF parsing error: {str(parse_error)}")
-            # Last resort: try with minimal settings
-            file_bytes.seek(0)
-            tables = tabula.read_pdf(
-                file_bytes, 
-                pages='all',
-                silent=True
-            )
+        finally:
+            if temp_path:
+                os.remove(temp_path)
         
         if not tables or all(df.empty for df in tables):
             raise Exception("No tables found in the PDF. The PDF may be encrypted, image-based, or in a format not supported by the parser.")
@@ -392,15 +564,15 @@ def parse_pdf(file):
         for col in combined_df.columns:
             col_str = str(col).lower()
             # Date column detection
-            if any(keyword in col_str for keyword in ['date', 'time', 'day', 'posting date', 'trans date', 'post', 'memo', 'transaction date']):
+            if PDF_DATE_COLUMN_RE.search(col_str):
                 date_col = col
                 print(f"Identified date column: {col}")
             # Description column detection
-            elif any(keyword in col_str for keyword in ['desc', 'narrative', 'details', 'transaction', 'merchant', 'payee', 'name', 'reference', 'memo', 'description']):
+            elif PDF_DESCRIPTION_COLUMN_RE.search(col_str):
                 description_col = col
                 print(f"Identified description column: {col}")
             # Amount column detection
-            elif any(keyword in col_str for keyword in ['amount', 'sum', 'value', 'debit', 'credit', 'balance', 'withdrawal', 'deposit']):
+            elif PDF_AMOUNT_COLUMN_RE.search(col_str):
                 amount_cols.append(col)
                 print(f"Identified amount column: {col}")
         
@@ -408,35 +580,27 @@ def parse_pdf(file):
         if not (date_col and description_col and amount_cols):
             print("Attempting to identify columns by content...")
             # Check each column for date-like content
+            # Infer each column's value type once; numeric columns cannot hold date text
+            inferred_types = {col: pd.api.types.infer_dtype(combined_df[col], skipna=True) for col in combined_df.columns}
+            
             for col in combined_df.columns:
+                # Sample the first few non-null values once for the checks below
+                sample_values = combined_df[col].dropna().head(5).astype(str)
+                
                 if not date_col:
-                    # Sample values and check if they look like dates
-                    sample_values = combined_df[col].dropna().astype(str).head(5)
                     print(f"Sample values for column {col}: {sample_values.tolist()}")
                     
                     # Check for column header with "Date" in it
                     if col == "Your transactions" or any(val.lower().startswith('date') for val in sample_values):
                         date_col = col
                         print(f"Found date column by header detection: {col}")
-                    else:
-                        # Check for date patterns in the content
-                        date_patterns = [
-                            r'\d{1,2}/\d{1,2}/\d{2,4}',  # MM/DD/YYYY or DD/MM/YYYY
-                            r'\d{1,2}-\d{1,2}-\d{2,4}',  # MM-DD-YYYY or DD-MM-YYYY
-                            r'\d{2,4}-\d{1,2}-\d{1,2}',  # YYYY-MM-DD
-                            r'\d{1,2}\s[A-Za-z]{3}\s\d{2,4}',  # DD MMM YYYY
-                            r'\d{1,2}\s[A-Za-z]{3}'  # DD MMM (without year)
-                        ]
-                        
-                        for pattern in date_patterns:
-                            if sample_values.str.contains(pattern, regex=True).any():
-                                date_col = col
-                                print(f"Found date column by pattern: {col}")
-                                break
+                    # Check for date patterns in the content
+                    elif inferred_types[col] not in NUMERIC_INFERRED_TYPES and sample_values.str.contains(ANY_DATE_RE, regex=True).any():
+                        date_col = col
+                        print(f"Found date column by pattern: {col}")
                 
                 # Check for description column (longest string values)
                 if not description_col and combined_df[col].dtype == 'object':
-                    sample_values = combined_df[col].dropna().astype(str).head(5)
                     if sample_values.str.len().mean() > 10:
                         description_col = col
                         print(f"Found description column by length: {col}")
@@ -444,7 +608,7 @@ def parse_pdf(file):
                 # Check for numeric columns that could be amounts
                 try:
                     # Try to convert to numeric after cleaning
-                    cleaned_vals = combined_df[col].astype(str).str.replace(r'[,$()+-]', '', regex=True)
+                    cleaned_vals = combined_df[col].dropna().head(SNIFF_N).astype(str).str.translate(AMOUNT_SYMBOLS_TRANS)
                     # Check if at least some values are numeric
                     if pd.to_numeric(cleaned_vals, errors='coerce').notna().any():
                         amount_cols.append(col)
@@ -475,57 +639,33 @@ def parse_pdf(file):
             if date_col == "Your transactions" or any('date description' in val.lower() for val in combined_df[date_col].astype(str).head(3)):
                 print("Using special date extraction for UK bank statement format")
                 
-                # Create a new date column by extracting dates from the text
-                extracted_dates = []
-                extracted_descriptions = []
+                # Extract "3 Sep"/"12 Sep" style dates from the text in one pass
+                texts = combined_df[date_col].astype(str)
+                date_parts = texts.str.extract(UK_DATE_RE, expand=True)
+                has_date = date_parts[0].notna()
                 
-                # Process each row
-                for idx, row in combined_df.iterrows():
-                    text = str(row[date_col])
-                    # UK date format: "3 Sep" or "12 Sep"
-                    date_match = re.search(r'(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)', text, re.IGNORECASE)
-                    
-                    if date_match:
-                        day = date_match.group(1)
-                        month = date_match.group(2)
-                        # Assume current year if not specified
-                        year = datetime.now().year
-                        date_str = f"{day} {month} {year}"
-                        
-                        try:
-                            # Parse the date
-                            extracted_date = pd.to_datetime(date_str, format="%d %b %Y", errors='coerce')
-                            extracted_dates.append(extracted_date)
-                            
-                            # Use the description part (after removing the date)
-                            desc = re.sub(r'\d{1,2}\s+[A-Za-z]{3}', '', text, 1).strip()
-                            extracted_descriptions.append(desc)
-                        except:
-                            extracted_dates.append(pd.NaT)
-                            extracted_descriptions.append(text)
-                    else:
-                        extracted_dates.append(pd.NaT)
-                        extracted_descriptions.append(text)
+                # Assume current year if not specified
+                date_strs = date_parts[0] + ' ' + date_parts[1] + f' {datetime.now().year}'
+                dates = cached_to_datetime(date_strs, "%d %b %Y")
                 
-                # Create Series from the lists
-                dates = pd.Series(extracted_dates)
-                descriptions = pd.Series(extracted_descriptions)
+                # Use the description part (after removing the date) where a date was found
+                stripped = texts.str.replace(UK_DATE_PREFIX_RE, '', n=1, regex=True).str.strip()
+                descriptions = stripped.where(has_date, texts)
                 print(f"Extracted {dates.notna().sum()} dates from combined date/description field")
                 
                 # If we also have a separate description column, try to combine the information
                 if description_col and description_col != date_col:
                     old_descriptions = combined_df[description_col].astype(str)
-                    # Combine where needed
-                    for i in range(len(descriptions)):
-                        if pd.notna(dates[i]) and descriptions[i] in ["", "Unknown"]:
-                            descriptions[i] = old_descriptions[i] if i < len(old_descriptions) else "Unknown"
+                    # Combine where needed, in one masked assignment
+                    needs_old = dates.notna() & descriptions.isin(["", "Unknown"])
+                    descriptions = descriptions.mask(needs_old, old_descriptions)
             else:
                 # Standard date parsing
                 # First clean the date strings
                 date_series = combined_df[date_col].astype(str)
                 # Remove any non-date characters that might be present
-                date_series = date_series.str.replace(r'[^\d/\-\s\w]', '', regex=True)
-                dates = pd.to_datetime(date_series, errors='coerce', dayfirst=True)
+                date_series = date_series.str.replace(NON_DATE_CHARS_RE, '', regex=True)
+                dates = to_datetime_dayfirst(date_series)
             
             # Extract descriptions
             print(f"Extracting descriptions from column: {description_col}")
@@ -537,9 +677,9 @@ def parse_pdf(file):
                 # Single amount column
                 amount_series = combined_df[amount_cols[0]].astype(str)
                 # Replace special characters
-                amount_series = amount_series.str.replace(r'[,$\s]', '', regex=True)
+                amount_series = amount_series.str.translate(AMOUNT_STRIP_TRANS)
                 # Handle negative indicators
-                amount_series = amount_series.str.replace(r'\((.+)\)', r'-\1', regex=True)  # Handle (100.00) format
+                amount_series = amount_series.str.replace(PAREN_NEGATIVE_RE, r'-\1', regex=True)  # Handle (100.00) format
                 amount_series = amount_series.str.replace('CR', '', regex=False)  # Remove CR indicator (credit)
                 amount_series = amount_series.str.replace('DR', '-', regex=False)  # Replace DR with minus (debit)
                 
@@ -552,20 +692,20 @@ def parse_pdf(file):
                 
                 for col in amount_cols:
                     col_str = str(col).lower()
-                    if 'debit' in col_str or 'payment' in col_str or 'withdrawal' in col_str:
+                    if PDF_DEBIT_COLUMN_RE.search(col_str):
                         debit_col = col
-                    elif 'credit' in col_str or 'deposit' in col_str or 'received' in col_str:
+                    elif PDF_CREDIT_COLUMN_RE.search(col_str):
                         credit_col = col
                 
                 if debit_col and credit_col:
                     print(f"Using debit column {debit_col} and credit column {credit_col}")
                     # Convert to numeric, handling special characters
                     debits = pd.to_numeric(combined_df[debit_col].astype(str)
-                                         .str.replace(r'[,$\s]', '', regex=True), 
+                                         .str.translate(AMOUNT_STRIP_TRANS), 
                                          errors='coerce').fillna(0)
                     
                     credits = pd.to_numeric(combined_df[credit_col].astype(str)
-                                          .str.replace(r'[,$\s]', '', regex=True), 
+                                          .str.translate(AMOUNT_STRIP_TRANS), 
                                           errors='coerce').fillna(0)
                     
                     # Credits are positive, debits are negative
@@ -574,8 +714,8 @@ def parse_pdf(file):
                     # If we can't identify debit/credit, use the first amount column
                     print(f"Using single amount column (best guess): {amount_cols[0]}")
                     amount_series = combined_df[amount_cols[0]].astype(str)
-                    amount_series = amount_series.str.replace(r'[,$\s]', '', regex=True)
-                    amount_series = amount_series.str.replace(r'\((.+)\)', r'-\1', regex=True)
+                    amount_series = amount_series.str.translate(AMOUNT_STRIP_TRANS)
+                    amount_series = amount_series.str.replace(PAREN_NEGATIVE_RE, r'-\1', regex=True)
                     amount_series = amount_series.str.replace('CR', '', regex=False)
                     amount_series = amount_series.str.replace('DR', '-', regex=False)
                     
@@ -584,25 +724,20 @@ def parse_pdf(file):
             # Create the result DataFrame
             result_df = pd.DataFrame({
                 'date': dates,
-                'description': descriptions.apply(lambda x: clean_description(x)),
+                'description': clean_description_series(descriptions),
                 'amount': amounts
             })
             
             # Clean up the data
-            # Remove rows with invalid dates
-            initial_rows = len(result_df)
-            result_df = result_df.dropna(subset=['date'])
-            date_dropped = initial_rows - len(result_df)
-            print(f"Dropped {date_dropped} rows with invalid dates")
-            
             # Ensure amount is numeric
             result_df['amount'] = pd.to_numeric(result_df['amount'], errors='coerce')
             
-            # Drop rows with missing amounts
-            amount_rows = len(result_df)
-            result_df = result_df.dropna(subset=['amount'])
-            amount_dropped = amount_rows - len(result_df)
-            print(f"Dropped {amount_dropped} rows with invalid amounts")
+            # Remove rows with invalid dates or missing amounts in a single selection
+            valid_dates = result_df['date'].notna().to_numpy()
+            valid_amounts = result_df['amount'].notna().to_numpy()
+            print(f"Dropped {np.count_nonzero(~valid_dates)} rows with invalid dates")
+            print(f"Dropped {np.count_nonzero(valid_dates & ~valid_amounts)} rows with invalid amounts")
+            result_df = result_df[valid_dates & valid_amounts]
             
             # Report final results
             print(f"Final dataframe shape: {result_df.shape}")
@@ -622,9 +757,10 @@ def parse_pdf(file):
             # Try to find any columns with numeric values that could be amounts
             for col in combined_df.columns:
                 try:
-                    numeric_values = pd.to_numeric(combined_df[col].astype(str).str.replace(r'[,$\s()]', '', regex=True), 
-                                                  errors='coerce')
-                    if numeric_values.notna().sum() > 0:
+                    # Strip symbols in a plain loop over the values rather than via astype(str).str
+                    cleaned_vals = [str(val).translate(AMOUNT_STRIP_PARENS_TRANS) for val in combined_df[col].tolist()]
+                    numeric_values = pd.Series(pd.to_numeric(cleaned_vals, errors='coerce'), index=combined_df.index)
+                    if numeric_values.notna().any():
                         simple_df['amount'] = numeric_values
                         break
                 except:
@@ -634,10 +770,10 @@ def parse_pdf(file):
             if 'amount' in simple_df.columns:
                 # Use the first column as date if not already identified
                 if date_col:
-                    simple_df['date'] = pd.to_datetime(combined_df[date_col], errors='coerce', dayfirst=True)
+                    simple_df['date'] = to_datetime_dayfirst(combined_df[date_col])
                 else:
                     for col in combined_df.columns:
-                        dates = pd.to_datetime(combined_df[col], errors='coerce', dayfirst=True)
+                        dates = to_datetime_dayfirst(combined_df[col])
                         if dates.notna().sum() > 0:
                             simple_df['date'] = dates
                             break
@@ -646,13 +782,11 @@ def parse_pdf(file):
                 if description_col:
                     simple_df['description'] = combined_df[description_col].astype(str)
                 else:
-                    text_lengths = {}
-                    for col in combined_df.columns:
-                        if col != date_col and combined_df[col].dtype == 'object':
-                            text_lengths[col] = combined_df[col].astype(str).str.len().mean()
+                    text_cols = (col for col in combined_df.columns
+                                 if col != date_col and combined_df[col].dtype == 'object')
+                    best_desc_col = max(text_cols, key=lambda col: mean_text_length(combined_df[col].head(SNIFF_N)), default=None)
                     
-                    if text_lengths:
-                        best_desc_col = max(text_lengths.items(), key=lambda x: x[1])[0]
+                    if best_desc_col is not None:
                         simple_df['description'] = combined_df[best_desc_col].astype(str)
                     else:
                         # Use the first non-date column as description
@@ -665,7 +799,7 @@ def parse_pdf(file):
                 if 'date' in simple_df.columns:
                     simple_df = simple_df.dropna(subset=['date'])
                 if 'description' in simple_df.columns:
-                    simple_df['description'] = simple_df['description'].apply(clean_description)
+                    simple_df['description'] = clean_description_series(simple_df['description'])
                 
                 # Ensure we have all required columns
                 for col in ['date', 'description', 'amount']:
@@ -700,8 +834,9 @@ def clean_description(desc):
     if not isinstance(desc, str):
         return str(desc)
     
-    # Remove extra whitespace
-    cleaned = ' '.join(desc.split())
+    # Remove extra whitespace (split/join is faster than a whitespace regex here)
+    normalized = ' '.join(desc.split())
+    cleaned = normalized
     
     # Special handling for Barclays format (observed in sample data)
     # Format is often: "VENDOR NAME      REFERENCE INFO"
@@ -719,126 +854,143 @@ def clean_description(desc):
                 vendor_part = parts[1].strip()
                 
                 # Clean up typical suffixes like "DDR" or "BGC"
-                vendor_part = re.sub(r'\b(DDR|BGC|CBP|BCC|CPM|BP|SO|DD|FT)$', '', vendor_part).strip()
+                vendor_part = BANK_CODE_SUFFIX_RE.sub('', vendor_part).strip()
                 
                 # Remove dates in the format "ON 29 JAN"
-                vendor_part = re.sub(r'ON\s+\d+\s+[A-Z]{3}', '', vendor_part).strip()
+                vendor_part = ON_DATE_RE.sub('', vendor_part).strip()
                 
                 return vendor_part
         
         return vendor_part
     
     # Check for UK direct debit/standing order format like "Direct Debit to BUPA" or "28 Nov Direct Debit to BUPA"
-    bupa_match = re.search(r'Direct\s+Debit\s+to\s+BUPA', cleaned, re.IGNORECASE)
+    bupa_match = BUPA_DIRECT_DEBIT_RE.search(cleaned)
     if bupa_match:
         return "BUPA Healthcare"
     
     # Check for other common UK bank formats - extract payee name from direct debits
-    dd_match = re.search(r'Direct\s+Debit\s+to\s+([A-Za-z0-9\s&]+)', cleaned, re.IGNORECASE)
+    dd_match = DIRECT_DEBIT_PAYEE_RE.search(cleaned)
     if dd_match:
         payee = dd_match.group(1).strip()
         return payee
     
     # Check for payment and transfer formats
-    payment_match = re.search(r'(Payment|Transfer)\s+to\s+([A-Za-z0-9\s&]+)', cleaned, re.IGNORECASE)
+    payment_match = PAYMENT_PAYEE_RE.search(cleaned)
     if payment_match:
         payee = payment_match.group(2).strip()
         return payee
     
     # Look for common UK reference formats (e.g., "Ref: VENDORNAME")
-    ref_match = re.search(r'Ref:\s*([A-Za-z0-9\s&]+)', cleaned, re.IGNORECASE)
+    ref_match = REFERENCE_NAME_RE.search(cleaned)
     if ref_match:
         ref = ref_match.group(1).strip()
         # Only return if ref looks like a proper name, not just numbers
-        if re.search(r'[A-Za-z]{3,}', ref):
+        if NAME_LIKE_RE.search(ref):
             return ref
     
     # Remove common reference numbers and codes
-    cleaned = re.sub(r'\b(REF|ID|TRXN|TRAN|TRANS|TRN)[\s#:]*\d+\b', '', cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r'\b\d{5,}\b', '', cleaned)  # Remove long numbers
+    cleaned = REFERENCE_NUMBER_RE.sub('', cleaned)
+    cleaned = LONG_NUMBER_RE.sub('', cleaned)  # Remove long numbers
     
     # Remove dates from description
-    date_patterns = [
-        r'\d{1,2}/\d{1,2}/\d{2,4}',
-        r'\d{1,2}-\d{1,2}-\d{2,4}',
-        r'\d{2,4}-\d{1,2}-\d{1,2}',
-        r'\d{1,2}\s[A-Za-z]{3}\s\d{2,4}'
-    ]
-    for pattern in date_patterns:
-        cleaned = re.sub(pattern, '', cleaned)
+    # (every pattern in DATE_PATTERNS except the year-less "DD MMM")
+    for pattern in DATE_PATTERNS[:4]:
+        cleaned = pattern.sub('', cleaned)
     
     # Remove common prefixes/suffixes that would interfere with merchant matching
-    prefixes = [
-        'PAYMENT TO ', 'PAYMENT FROM ', 'PURCHASE AT ', 'POS PURCHASE ', 
-        'DEPOSIT AT ', 'ATM ', 'CHQ ', 'CHEQUE ', 'DIRECT DEPOSIT ', 
-        'ACH ', 'CREDIT ', 'DEBIT ', 'DIRECT DEBIT TO '
-    ]
-    for prefix in prefixes:
-        if cleaned.upper().startswith(prefix):
+    # (upper-case the description once and trim both copies together)
+    upper = cleaned.upper()
+    for prefix in DESCRIPTION_PREFIXES:
+        if upper.startswith(prefix):
             cleaned = cleaned[len(prefix):]
+            upper = upper[len(prefix):]
     
     # Remove extra whitespace again after all processing
     cleaned = ' '.join(cleaned.split())
     
-    # Special case handling for common merchants
-    # Credit cards
-    if re.search(r'AMEX|American Express', cleaned, re.IGNORECASE):
-        return "American Express"
-    if re.search(r'VISA|MASTERCARD|CREDIT CARD PMT', cleaned, re.IGNORECASE):
-        return "Credit Card Payment"
-        
-    # Common retailers 
-    if re.search(r'AMAZON|AMZN', cleaned, re.IGNORECASE):
-        return "Amazon"
-    if re.search(r'TESCO', cleaned, re.IGNORECASE):
-        return "Tesco"
-    if re.search(r'SAINSBURY', cleaned, re.IGNORECASE):
-        return "Sainsbury's"
-    if re.search(r'ASDA', cleaned, re.IGNORECASE):
-        return "Asda"
-    if re.search(r'ALDI', cleaned, re.IGNORECASE):
-        return "Aldi"
-    if re.search(r'LIDL', cleaned, re.IGNORECASE):
-        return "Lidl"
-    if re.search(r'MORRISONS', cleaned, re.IGNORECASE):
-        return "Morrisons"
-    if re.search(r'WAITROSE', cleaned, re.IGNORECASE):
-        return "Waitrose"
-    if re.search(r'IKEA', cleaned, re.IGNORECASE):
-        return "IKEA"
-    
-    # Utilities and services
-    if re.search(r'NETFLIX', cleaned, re.IGNORECASE):
-        return "Netflix"
-    if re.search(r'SPOTIFY', cleaned, re.IGNORECASE):
-        return "Spotify"
-    if re.search(r'BRITISH GAS|BRITISHGAS', cleaned, re.IGNORECASE):
-        return "British Gas"
-    if re.search(r'EDF|E\.D\.F', cleaned, re.IGNORECASE):
-        return "EDF Energy"
-    if re.search(r'THAMES WATER|THAMESWATER', cleaned, re.IGNORECASE):
-        return "Thames Water"
-    if re.search(r'TV LICENSE|TVLICENSE', cleaned, re.IGNORECASE):
-        return "TV License"
-    if re.search(r'(?<![A-Z])SKY(?![A-Z])', cleaned, re.IGNORECASE):
-        return "Sky"
-    if re.search(r'VIRGIN MEDIA|VIRGINMEDIA', cleaned, re.IGNORECASE):
-        return "Virgin Media"
-    if re.search(r'BT GROUP|BTGROUP|BT\.COM', cleaned, re.IGNORECASE):
-        return "BT"
+    # Special case handling for common merchants (credit cards, retailers, utilities)
+    merchant_match = MERCHANT_RE.match(cleaned)
+    if merchant_match:
+        return MERCHANT_LABELS[merchant_match.lastgroup]
         
     # Remove transaction type indicators that remain
-    type_indicators = [
-        'PURCHASE', 'PAYMENT', 'TRANSFER', 'FEE', 'INTEREST', 'DEPOSIT', 'WITHDRAWAL',
-        'REFUND', 'REVERSAL', 'CHARGE', 'CREDIT', 'DEBIT', 'TRANSACTION'
-    ]
-    for indicator in type_indicators:
-        cleaned = re.sub(rf'\b{indicator}\b', '', cleaned, flags=re.IGNORECASE)
+    cleaned = TYPE_INDICATOR_RE.sub('', cleaned)
     
     # Final cleanup - if we've stripped too much, return original
     cleaned = cleaned.strip()
     if len(cleaned) < 2:
         # If we've removed too much, return the original with basic cleaning
-        return ' '.join(desc.split())
+        return normalized
         
     return cleaned
+
+def clean_description_series(descriptions):
+    """
+    Clean a column of transaction descriptions, cleaning each distinct value only once.
+    
+    Args:
+        descriptions: Series of original transaction descriptions
+    
+    Returns:
+        Categorical Series of cleaned descriptions with the same index
+    """
+    codes, uniques = pd.factorize(descriptions, use_na_sentinel=False)
+    # Cleaning maps many descriptions onto a few merchant names, so store the result as
+    # a categorical: one small integer code per row plus the distinct cleaned names
+    cleaned = pd.Categorical([clean_description(desc) for desc in uniques])
+    return pd.Series(cleaned.take(codes), index=descriptions.index, name=descriptions.name)
+
+def mean_text_length(values):
+    """
+    Average length of the values as text, measured in one pass over the values.
+    
+    Args:
+        values: Series of values; non-strings are measured as str(value)
+    
+    Returns:
+        Mean length, or 0.0 if there are no values
+    """
+    values = values.tolist()
+    if not values:
+        return 0.0
+    return sum(map(len, map(str, values))) / len(values)
+
+def to_datetime_dayfirst(series):
+    """
+    Parse day-first dates, trying the common statement formats before general parsing.
+    
+    A fixed format is only used if it reads every date in the column, so the result
+    matches pd.to_datetime(..., dayfirst=True) while skipping per-value format guessing.
+    
+    Args:
+        series: Series of dates (strings or datetimes)
+    
+    Returns:
+        Series of datetimes, with NaT where a value could not be parsed
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    
+    if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+        present_count = series.notna().sum()
+        for fmt in DAYFIRST_DATE_FORMATS:
+            dates = pd.to_datetime(series, errors='coerce', format=fmt, cache=True)
+            if dates.notna().sum() == present_count:
+                return dates
+    
+    return pd.to_datetime(series, errors='coerce', dayfirst=True, cache=True)
+
+def cached_to_datetime(series, fmt):
+    """
+    Parse a column of date strings, converting each distinct value only once.
+    
+    Args:
+        series: Series of date strings (may contain missing values)
+        fmt: strftime format of the dates
+    
+    Returns:
+        Series of datetimes, with NaT where a value could not be parsed
+    """
+    uniques = series.unique()
+    mapping = dict(zip(uniques, pd.to_datetime(uniques, format=fmt, errors='coerce')))
+    return series.map(mapping)
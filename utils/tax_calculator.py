@@ -1,60 +1,88 @@
-def calculate_tax_liability(annual_income, tax_brackets):
+import numpy as np
+from functools import lru_cache
+from operator import itemgetter
+
+def bracket_arrays(tax_brackets):
+    """
+    Convert tax brackets into NumPy arrays sorted by the bracket minimum.
+    
+    Args:
+        tax_brackets: List of dictionaries with tax bracket information (min, max, rate)
+    
+    Returns:
+        Tuple of (mins, maxes, rates) read-only float arrays
+    """
+    return sorted_bracket_arrays(brackets_key(tax_brackets))
+
+def brackets_key(tax_brackets):
+    """Describe tax brackets as a hashable tuple of (min, max, rate) tuples."""
+    return tuple((bracket['min'], bracket['max'], bracket['rate']) for bracket in tax_brackets)
+
+@lru_cache(maxsize=8)
+def sorted_bracket_arrays(brackets_key):
+    """
+    Sort and convert tax brackets once per distinct set of brackets.
+    
+    Args:
+        brackets_key: Tuple of (min, max, rate) tuples
+    
+    Returns:
+        Tuple of (mins, maxes, rates) read-only float arrays
+    """
+    # Sort tax brackets by min value to ensure correct order
+    sorted_brackets = np.array(sorted(brackets_key, key=itemgetter(0)), dtype=float).reshape(-1, 3)
+    mins, maxes, rates = sorted_brackets.T.copy()
+    # The arrays are shared between calls, so guard them against modification
+    for values in (mins, maxes, rates):
+        values.setflags(write=False)
+    return mins, maxes, rates
+
+def bracket_breakdown_records(mins, maxes, rates, income_in_bracket, tax_amount):
+    """
+    Describe the brackets that had income in them.
+    
+    Args:
+        mins, maxes, rates: Bracket arrays from bracket_arrays
+        income_in_bracket: Income falling in each bracket
+        tax_amount: Tax charged in each bracket
+    
+    Returns:
+        List of dictionaries, one per bracket with income in it
+    """
+    taxed = income_in_bracket > 0
+    return [
+        {
+            'min': min_amount,
+            'max': max_amount,
+            'rate': rate,
+            'income_in_bracket': income,
+            'tax_amount': tax
+        }
+        for min_amount, max_amount, rate, income, tax in zip(
+            mins[taxed].tolist(), maxes[taxed].tolist(), rates[taxed].tolist(),
+            income_in_bracket[taxed].tolist(), tax_amount[taxed].tolist()
+        )
+    ]
+
+def calculate_tax_liability(annual_income, tax_brackets, include_breakdown=True):
     """
     Calculate tax liability based on annual income and tax brackets.
     
     Args:
         annual_income: Annual income amount
         tax_brackets: List of dictionaries with tax bracket information (min, max, rate)
+        include_breakdown: Whether to list the tax charged in each bracket; if False,
+            'bracket_breakdown' is None
     
     Returns:
         Dictionary with tax liability information
     """
-    # Sort tax brackets by min value to ensure correct order
-    sorted_brackets = sorted(tax_brackets, key=lambda x: x['min'])
-    
-    # Initialize variables for calculating tax
-    total_tax = 0
-    remaining_income = annual_income
-    bracket_breakdown = []
-    
-    # Calculate tax for each bracket
-    for bracket in sorted_brackets:
-        min_amount = bracket['min']
-        max_amount = bracket['max']
-        rate = bracket['rate']
-        
-        # Calculate income in this bracket
-        if remaining_income <= 0:
-            income_in_bracket = 0
-        elif min_amount <= remaining_income <= max_amount:
-            income_in_bracket = remaining_income - min_amount
-        elif remaining_income > max_amount:
-            income_in_bracket = max_amount - min_amount
-        else:  # remaining_income < min_amount
-            income_in_bracket = 0
-        
-        # Calculate tax for this bracket
-        tax_amount = income_in_bracket * rate
-        
-        # Add to total tax
-        total_tax += tax_amount
-        
-        # Reduce remaining income
-        remaining_income -= income_in_bracket
-        
-        # Add to breakdown if there was income in this bracket
-        if income_in_bracket > 0:
-            bracket_breakdown.append({
-                'min': min_amount,
-                'max': max_amount,
-                'rate': rate,
-                'income_in_bracket': income_in_bracket,
-                'tax_amount': tax_amount
-            })
-        
-        # If no more income to tax, break out of the loop
-        if remaining_income <= 0:
-            break
+    mins, maxes, rates = bracket_arrays(tax_brackets)
+    
+    # The part of the income that falls inside each bracket, taxed at that bracket's rate
+    income_in_bracket = np.clip(annual_income - mins, 0.0, maxes - mins)
+    tax_amount = income_in_bracket * rates
+    total_tax = tax_amount.sum().item()
     
     # Calculate effective tax rate
     effective_rate = (total_tax / annual_income * 100) if annual_income > 0 else 0
@@ -63,5 +91,42 @@ def calculate_tax_liability(annual_income, tax_brackets):
         'annual_income': annual_income,
         'total_tax': total_tax,
         'effective_rate': effective_rate,
-        'bracket_breakdown': bracket_breakdown
+        'bracket_breakdown': (bracket_breakdown_records(mins, maxes, rates, income_in_bracket, tax_amount)
+                              if include_breakdown else None)
     }
+
+def calculate_tax_liabilities(annual_incomes, tax_brackets, include_breakdown=True):
+    """
+    Calculate tax liability for several annual incomes at once.
+    
+    Computes every income's share of every bracket in one NumPy operation and
+    gives the same results as calling calculate_tax_liability for each income.
+    
+    Args:
+        annual_incomes: Sequence of annual income amounts
+        tax_brackets: List of dictionaries with tax bracket information (min, max, rate)
+        include_breakdown: Whether to list the tax charged in each bracket; if False,
+            'bracket_breakdown' is None
+    
+    Returns:
+        List of dictionaries with tax liability information, one per income
+    """
+    incomes = np.asarray(annual_incomes, dtype=float)
+    mins, maxes, rates = bracket_arrays(tax_brackets)
+    
+    # One row per income, one column per bracket
+    income_in_bracket = np.clip(incomes[:, None] - mins, 0.0, maxes - mins)
+    tax_amount = income_in_bracket * rates
+    total_tax = tax_amount.sum(axis=1)
+    
+    results = []
+    for i, (annual_income, total) in enumerate(zip(incomes.tolist(), total_tax.tolist())):
+        results.append({
+            'annual_income': annual_income,
+            'total_tax': total,
+            'effective_rate': (total / annual_income * 100) if annual_income > 0 else 0,
+            'bracket_breakdown': (bracket_breakdown_records(mins, maxes, rates, income_in_bracket[i], tax_amount[i])
+                                  if include_breakdown else None)
+        })
+    
+    return results
@@ -3,7 +3,13 @@ Vendor database and smart categorization for the Personal Finance App.
 This module provides a database of well-known vendors and merchants, along with
 their appropriate categorization for accurate transaction classification.
 """
+import logging
 import re
+from functools import lru_cache, partial
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 # Dictionary of known merchants and their categories
 # Format: 'merchant_name': {'category': 'Category', 'subcategory': 'Subcategory'}
@@ -24,9 +30,9 @@ VENDOR_DATABASE = {
     'kraken': {'category': 'Savings', 'subcategory': 'Investments'},
     'direct debit': {'category': 'Bills & Payments', 'subcategory': 'Direct Debit'},
     'counter credit': {'category': 'Income', 'subcategory': 'Deposit'},
-    'hmrc': {'category': 'Bills & Payments', 'subcategory': 'Taxes'},
+    'hmrc': {'category': 'Taxes', 'subcategory': 'Income Tax'},
     'hmrc gov.uk': {'category': 'Bills & Payments', 'subcategory': 'Taxes'},
-    'tax': {'category': 'Bills & Payments', 'subcategory': 'Taxes'},
+    'tax': {'category': 'Taxes', 'subcategory': 'General Tax'},
     
     # UK-specific Banking Terms
     'instant saver': {'category': 'Transfer', 'subcategory': 'Internal Transfer'},
@@ -41,7 +47,7 @@ VENDOR_DATABASE = {
     'hsbc': {'category': 'Transfer', 'subcategory': 'Bank Transfer'},
     'lloyds': {'category': 'Transfer', 'subcategory': 'Bank Transfer'},
     'natwest': {'category': 'Transfer', 'subcategory': 'Bank Transfer'},
-    'nationwide': {'category': 'Transfer', 'subcategory': 'Bank Transfer'},
+    'nationwide': {'category': 'Insurance', 'subcategory': 'Auto Insurance'},
     'santander': {'category': 'Transfer', 'subcategory': 'Bank Transfer'},
     'monzo': {'category': 'Transfer', 'subcategory': 'Bank Transfer'},
     'starling': {'category': 'Transfer', 'subcategory': 'Bank Transfer'},
@@ -61,7 +67,6 @@ VENDOR_DATABASE = {
     'ramco': {'category': 'Income', 'subcategory': 'Business Income'},
     'ramco manor park': {'category': 'Income', 'subcategory': 'Business Income'},
     'jn desai limited': {'category': 'Income', 'subcategory': 'Business Income'},
-    'instant saver': {'category': 'Transfer', 'subcategory': 'Internal Transfer'},
     'saver': {'category': 'Transfer', 'subcategory': 'Internal Transfer'},
     'astrenska': {'category': 'Income', 'subcategory': 'Insurance Payout'},
     'astrenska insuranc': {'category': 'Income', 'subcategory': 'Insurance Payout'},
@@ -76,7 +81,7 @@ VENDOR_DATABASE = {
     'lidl': {'category': 'Food', 'subcategory': 'Groceries'},
     'kroger': {'category': 'Food', 'subcategory': 'Groceries'},
     'walmart': {'category': 'Food', 'subcategory': 'Groceries'},
-    'target': {'category': 'Food', 'subcategory': 'Groceries'},
+    'target': {'category': 'Shopping', 'subcategory': 'Department Store'},
     'safeway': {'category': 'Food', 'subcategory': 'Groceries'},
     'trader joe': {'category': 'Food', 'subcategory': 'Groceries'},
     'whole foods': {'category': 'Food', 'subcategory': 'Groceries'},
@@ -91,7 +96,7 @@ VENDOR_DATABASE = {
     'starbucks': {'category': 'Food', 'subcategory': 'Coffee Shops'},
     'costa': {'category': 'Food', 'subcategory': 'Coffee Shops'},
     'pret': {'category': 'Food', 'subcategory': 'Coffee Shops'},
-    'subway': {'category': 'Food', 'subcategory': 'Fast Food'},
+    'subway': {'category': 'Transportation', 'subcategory': 'Public Transit'},
     'kfc': {'category': 'Food', 'subcategory': 'Fast Food'},
     'taco bell': {'category': 'Food', 'subcategory': 'Fast Food'},
     'pizza hut': {'category': 'Food', 'subcategory': 'Dining'},
@@ -121,7 +126,6 @@ VENDOR_DATABASE = {
     'lowes': {'category': 'Shopping', 'subcategory': 'Home Improvement'},
     'b&q': {'category': 'Shopping', 'subcategory': 'Home Improvement'},
     'homebase': {'category': 'Shopping', 'subcategory': 'Home Improvement'},
-    'target': {'category': 'Shopping', 'subcategory': 'Department Store'},
     'marshalls': {'category': 'Shopping', 'subcategory': 'Clothing'},
     'tj maxx': {'category': 'Shopping', 'subcategory': 'Clothing'},
     'tk maxx': {'category': 'Shopping', 'subcategory': 'Clothing'},
@@ -152,7 +156,6 @@ VENDOR_DATABASE = {
     'bus': {'category': 'Transportation', 'subcategory': 'Public Transit'},
     'oyster': {'category': 'Transportation', 'subcategory': 'Public Transit'},
     'underground': {'category': 'Transportation', 'subcategory': 'Public Transit'},
-    'subway': {'category': 'Transportation', 'subcategory': 'Public Transit'},
     'avis': {'category': 'Transportation', 'subcategory': 'Car Rental'},
     'hertz': {'category': 'Transportation', 'subcategory': 'Car Rental'},
     'enterprise': {'category': 'Transportation', 'subcategory': 'Car Rental'},
@@ -183,7 +186,7 @@ VENDOR_DATABASE = {
     'rent': {'category': 'Housing', 'subcategory': 'Rent'},
     'mortgage': {'category': 'Housing', 'subcategory': 'Mortgage'},
     'council tax': {'category': 'Housing', 'subcategory': 'Property Tax'},
-    'property tax': {'category': 'Housing', 'subcategory': 'Property Tax'},
+    'property tax': {'category': 'Taxes', 'subcategory': 'Property Tax'},
     'water': {'category': 'Utilities', 'subcategory': 'Water'},
     'electric': {'category': 'Utilities', 'subcategory': 'Electricity'},
     'electricity': {'category': 'Utilities', 'subcategory': 'Electricity'},
@@ -286,7 +289,6 @@ VENDOR_DATABASE = {
     'progressive': {'category': 'Insurance', 'subcategory': 'Auto Insurance'},
     'allstate': {'category': 'Insurance', 'subcategory': 'Auto Insurance'},
     'liberty mutual': {'category': 'Insurance', 'subcategory': 'Auto Insurance'},
-    'nationwide': {'category': 'Insurance', 'subcategory': 'Auto Insurance'},
     'aviva': {'category': 'Insurance', 'subcategory': 'General Insurance'},
     'direct line': {'category': 'Insurance', 'subcategory': 'Auto Insurance'},
     'admiral': {'category': 'Insurance', 'subcategory': 'Auto Insurance'},
@@ -346,11 +348,8 @@ VENDOR_DATABASE = {
     'service charge': {'category': 'Fees & Charges', 'subcategory': 'Bank Fees'},
     'maintenance fee': {'category': 'Fees & Charges', 'subcategory': 'Bank Fees'},
     'late fee': {'category': 'Fees & Charges', 'subcategory': 'Late Payment'},
-    'tax': {'category': 'Taxes', 'subcategory': 'General Tax'},
-    'hmrc': {'category': 'Taxes', 'subcategory': 'Income Tax'},
     'irs': {'category': 'Taxes', 'subcategory': 'Income Tax'},
     'income tax': {'category': 'Taxes', 'subcategory': 'Income Tax'},
-    'property tax': {'category': 'Taxes', 'subcategory': 'Property Tax'},
     'charity': {'category': 'Giving', 'subcategory': 'Charitable Donations'},
     'donation': {'category': 'Giving', 'subcategory': 'Charitable Donations'},
     'gift': {'category': 'Giving', 'subcategory': 'Gifts'},
@@ -359,10 +358,269 @@ VENDOR_DATABASE = {
 }
 
 
+# Vendor categorizations in database order, indexed by VENDOR_INDEX
+VENDOR_INDEX = {vendor: i for i, vendor in enumerate(VENDOR_DATABASE)}
+VENDOR_CATEGORIZATIONS = list(VENDOR_DATABASE.values())
+
+def trie_pattern(words):
+    """
+    Build a regex pattern matching any of the given words, nested by shared prefix.
+    
+    Alternatives that share a prefix are merged so the regex engine follows one branch
+    per character instead of trying every word in turn, and longer words are tried
+    before their prefixes so the pattern matches the longest word it can.
+    
+    Args:
+        words: Iterable of non-empty strings
+    
+    Returns:
+        Regex pattern string
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def branch(node):
+        alternatives = [re.escape(char) + branch(child) for char, child in node.items() if char]
+        if not alternatives:
+            return ''
+        pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        # A word ends here, so the longer words through this node are optional
+        return '(?:' + pattern + ')?' if '' in node else pattern
+    
+    return branch(trie)
+
+def vendor_scanner(vendors, word_boundary=False):
+    """
+    Build a single-pass scanner that finds which of the given vendors occur in a description.
+    
+    At each position the regex matches the longest vendor name starting there. Any other
+    vendor matching at the same position is a prefix of that name, so each name is mapped
+    to the earliest database entry among its matching prefixes.
+    
+    Args:
+        vendors: Vendor names from VENDOR_DATABASE
+        word_boundary: Whether vendor names must appear as whole words
+    
+    Returns:
+        Tuple of (compiled regex, dictionary of vendor name to VENDOR_INDEX position);
+        see find_vendor
+    """
+    vendors = list(vendors)
+    pattern = '(' + trie_pattern(vendors) + ')'
+    if word_boundary:
+        pattern = r'\b(?=' + pattern + r'\b)'
+    else:
+        pattern = '(?=' + pattern + ')'
+    
+    earliest = {}
+    for vendor in vendors:
+        earliest[vendor] = min(
+            VENDOR_INDEX[prefix] for prefix in vendors
+            if vendor.startswith(prefix)
+            and (not word_boundary or prefix == vendor or re.match(re.escape(prefix) + r'\b', vendor))
+        )
+    return re.compile(pattern), earliest
+
+def find_vendor(scanner, desc_lower):
+    """
+    Find the first vendor in database order that occurs in a description.
+    
+    Args:
+        scanner: Scanner built by vendor_scanner
+        desc_lower: Lowercased transaction description
+    
+    Returns:
+        Categorization dictionary of the vendor, or None if no vendor matched
+    """
+    vendor_re, earliest = scanner
+    best = min((earliest[match.group(1)] for match in vendor_re.finditer(desc_lower)), default=None)
+    if best is None:
+        return None
+    return VENDOR_CATEGORIZATIONS[best]
+
+# Vendor names found anywhere in the description
+VENDOR_SUBSTRING_SCANNER = vendor_scanner(VENDOR_DATABASE)
+# Vendor names found as whole words
+VENDOR_WORD_SCANNER = vendor_scanner(VENDOR_DATABASE, word_boundary=True)
+# Multi-word vendor names found anywhere in the description
+MULTI_WORD_VENDOR_SCANNER = vendor_scanner(vendor for vendor in VENDOR_DATABASE if ' ' in vendor)
+
+def vendor_words(vendor):
+    """
+    Split a vendor name into the words used for partial matching.
+    
+    Args:
+        vendor: Vendor name from VENDOR_DATABASE
+    
+    Returns:
+        Tuple of (frozenset of words, required overlap, name length); multi-word vendors
+        with more than two words need at least two words in common with a description
+    """
+    words = frozenset(vendor.split())
+    return words, 2 if len(words) > 2 else 1, len(vendor)
+
+# Word sets of each vendor in database order, for partial matches; a tuple, since the
+# positions are indexed by VENDOR_WORD_INDEX and must not change
+VENDOR_WORDS = tuple(
+    (*vendor_words(vendor), categorization) for vendor, categorization in VENDOR_DATABASE.items()
+)
+
+def word_index(word_sets):
+    """
+    Build an inverted index from each word to the positions of the word sets containing it.
+    
+    Args:
+        word_sets: Sequence of sets of words
+    
+    Returns:
+        Dictionary of word to list of positions, in ascending order
+    """
+    index = {}
+    for i, words in enumerate(word_sets):
+        for word in words:
+            index.setdefault(word, []).append(i)
+    return index
+
+# Positions in VENDOR_WORDS of the vendors using each word
+VENDOR_WORD_INDEX = {
+    word: tuple(positions)
+    for word, positions in word_index([words for words, _, _, _ in VENDOR_WORDS]).items()
+}
+
+def keyword_pattern(keywords):
+    """Compile a list of keywords into one regex that finds any of them in a string."""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+# Keyword lists checked by match_vendor, each found with a single regex search
+TRADING_PLATFORM_RE = keyword_pattern(["etoro", "trading 212", "coinbase", "binance"])
+PERSONAL_NAME_RE = keyword_pattern(["jay", "desai", "j n desai"])
+BANK_ACCOUNT_RE = keyword_pattern(["instant saver", "savings account", "isa", "current account"])
+PAY_RE = keyword_pattern(["pay", "payroll", "salary", "wage", "income", "direct deposit"])
+
+def override_rules(rules):
+    """Compile (keywords, categorization) pairs into (regex, categorization) pairs."""
+    return [(keyword_pattern(keywords), categorization) for keywords, categorization in rules]
+
+def first_override(overrides, desc_lower):
+    """
+    Find the first override whose keywords appear in a description.
+    
+    Args:
+        overrides: List of (regex, categorization) pairs from override_rules
+        desc_lower: Lowercased transaction description
+    
+    Returns:
+        Categorization dictionary of the first matching override, None if none match
+    """
+    for pattern, categorization in overrides:
+        if pattern.search(desc_lower):
+            return categorization
+    return None
+
+# Vendor overrides for each bank subcategory, checked in order
+COUNTER_CREDIT_OVERRIDES = override_rules([
+    # Specific patterns from Barclays
+    (["ramco", "jn desai limited"], {'category': 'Income', 'subcategory': 'Business Income'}),
+    (["astrenska"], {'category': 'Income', 'subcategory': 'Insurance Payout'}),
+    (["tax", "instant saver", "instant access"], {'category': 'Transfer', 'subcategory': 'Internal Transfer'}),
+    # Enhanced internal transfer detection for UK banks
+    ([
+        "saver", "savings", "isa", "transfer to", "transfer from",
+        "instant access", "desai", "jay", "bank transfer"
+    ], {'category': 'Transfer', 'subcategory': 'Internal Transfer'}),
+    # Generic patterns
+    (["limited", "ltd", "llc"], {'category': 'Income', 'subcategory': 'Business Income'}),
+    (["salary", "wage", "payroll"], {'category': 'Income', 'subcategory': 'Salary/Wages'}),
+])
+DIRECT_DEBIT_OVERRIDES = override_rules([
+    # Special Direct Debit patterns from Barclays
+    # BUPA is health insurance
+    (["bupa"], {'category': 'Healthcare', 'subcategory': 'Health Insurance'}),
+    # American Express is credit card payment
+    (["american express", "amex"], {'category': 'Bills & Payments', 'subcategory': 'Credit Card'}),
+    # Eyecare is vision insurance/payments
+    (["eyecare"], {'category': 'Healthcare', 'subcategory': 'Vision'}),
+    # AIG Life and Royal London are usually life insurance
+    (["aig life", "royal london"], {'category': 'Insurance', 'subcategory': 'Life Insurance'}),
+    # Clubwise is usually gym/fitness
+    (["clubwise"], {'category': 'Healthcare', 'subcategory': 'Fitness'}),
+    # Etika is usually subscriptions
+    (["etika"], {'category': 'Entertainment', 'subcategory': 'Subscription Services'}),
+])
+CARD_PURCHASE_OVERRIDES = override_rules([
+    # Apple subscriptions
+    (["apple.com"], {'category': 'Entertainment', 'subcategory': 'Subscription Services'}),
+    # HMRC tax payments
+    (["hmrc", "gov.uk"], {'category': 'Bills & Payments', 'subcategory': 'Tax Payments'}),
+    (["mcdonalds"], {'category': 'Food', 'subcategory': 'Fast Food'}),
+    (["sainsburys"], {'category': 'Food', 'subcategory': 'Groceries'}),
+])
+DEBIT_OVERRIDES = override_rules([
+    # Blue rewards is a fee
+    (["blue rewards"], {'category': 'Bills & Payments', 'subcategory': 'Bank Fees'}),
+    (["mcdonalds"], {'category': 'Food', 'subcategory': 'Fast Food'}),
+    (["sainsburys"], {'category': 'Food', 'subcategory': 'Groceries'}),
+])
+FUNDS_TRANSFER_OVERRIDES = override_rules([
+    # eToro is investment platform
+    (["etoro"], {'category': 'Investments', 'subcategory': 'Trading Platform'}),
+    # Tax payments to government
+    (["hmrc", "gov.uk"], {'category': 'Bills & Payments', 'subcategory': 'Tax Payments'}),
+    # Internal transfers with "tax" in the description (likely between accounts)
+    (["tax"], {'category': 'Transfer', 'subcategory': 'Internal Transfer'}),
+    # Payward/Kraken is cryptocurrency - categorized as Savings/Investments
+    (["payward"], {'category': 'Savings', 'subcategory': 'Investments'}),
+    # Transfers to/from self - common name patterns
+    ([
+        "jay", "desai", "transfer to", "transfer from", "instant saver", "savings account"
+    ], {'category': 'Transfer', 'subcategory': 'Internal Transfer'}),
+])
+
+def counter_credit_match(desc_lower):
+    """Counter Credit is usually income."""
+    return (first_override(COUNTER_CREDIT_OVERRIDES, desc_lower)
+            or {'category': 'Income', 'subcategory': 'Other Income'})
+
+def direct_debit_match(desc_lower):
+    """Direct Debit is usually bills; look for known vendors before the generic bill payment."""
+    return (first_override(DIRECT_DEBIT_OVERRIDES, desc_lower)
+            or find_vendor(VENDOR_SUBSTRING_SCANNER, desc_lower)
+            or {'category': 'Bills & Payments', 'subcategory': 'Direct Debit'})
+
+# Handlers for UK bank subcategories, applied in order until one matches. Barclays
+# "Debit" must be the whole subcategory; the others only need to appear in it.
+SUBCATEGORY_HANDLERS = [
+    (re.compile('counter credit'), counter_credit_match),
+    (re.compile('direct debit'), direct_debit_match),
+    (re.compile('card purchase'), partial(first_override, CARD_PURCHASE_OVERRIDES)),
+    (re.compile(r'\Adebit\Z'), partial(first_override, DEBIT_OVERRIDES)),
+    (re.compile('funds transfer'), partial(first_override, FUNDS_TRANSFER_OVERRIDES)),
+]
+
+@lru_cache(maxsize=None)
+def subcategory_handlers(subcat_lower):
+    """
+    Pick the handlers that apply to a bank subcategory, once per distinct subcategory.
+    
+    Args:
+        subcat_lower: Lowercased, stripped subcategory
+    
+    Returns:
+        Tuple of handlers taking the lowercased description, in the order to try them
+    """
+    return tuple(handler for pattern, handler in SUBCATEGORY_HANDLERS if pattern.search(subcat_lower))
+
 def match_vendor(description, subcategory=None, amount=None):
     """
     Match a transaction description to a known vendor in the database.
     
+    Results are cached per (description, subcategory), since statements repeat the
+    same descriptions month after month.
+    
     Args:
         description: Transaction description string
         subcategory: Optional subcategory from transaction data (e.g., "Direct Debit")
@@ -371,8 +629,42 @@ def match_vendor(description, subcategory=None, amount=None):
     Returns:
         Dictionary with category and subcategory if matched, None otherwise
     """
-    # Print debug information
-    print(f"Matching: Description='{description}', Subcategory='{subcategory}', Amount={amount}")
+    # Log debug information; the message is only formatted when debug logging is on
+    logger.debug("Matching: Description=%r, Subcategory=%r, Amount=%r", description, subcategory, amount)
+    match = cached_vendor_match(description, subcategory)
+    if match is None:
+        return None
+    category, matched_subcategory = match
+    return {'category': category, 'subcategory': matched_subcategory}
+
+@lru_cache(maxsize=100_000)
+def cached_vendor_match(description, subcategory):
+    """
+    Match a description with match_vendor_rules, once per distinct (description, subcategory).
+    
+    Args:
+        description: Transaction description string
+        subcategory: Subcategory from transaction data, or None
+    
+    Returns:
+        Tuple of (category, subcategory) if matched, None otherwise
+    """
+    match = match_vendor_rules(description, subcategory)
+    if match is None:
+        return None
+    return match['category'], match['subcategory']
+
+def match_vendor_rules(description, subcategory=None):
+    """
+    Apply the vendor matching rules to a transaction description, without caching.
+    
+    Args:
+        description: Transaction description string
+        subcategory: Optional subcategory from transaction data (e.g., "Direct Debit")
+        
+    Returns:
+        Dictionary with category and subcategory if matched, None otherwise
+    """
     if not description:
         return None
     
@@ -380,11 +672,11 @@ def match_vendor(description, subcategory=None, amount=None):
     desc_lower = description.lower().strip()
     
     # Convert subcategory to lowercase if it exists
-    subcat_lower = subcategory.lower() if subcategory else ""
+    subcat_lower = subcategory.lower().strip() if subcategory else ""
     
     # Check for internal transfers based on description - do this first
     # Specific investment platform checks
-    if any(platform in desc_lower for platform in ["etoro", "trading 212", "coinbase", "binance"]):
+    if TRADING_PLATFORM_RE.search(desc_lower):
         return {'category': 'Investments', 'subcategory': 'Trading Platform'}
     
     # Cryptocurrency exchanges - categorize as investments    
@@ -393,7 +685,7 @@ def match_vendor(description, subcategory=None, amount=None):
     
     # Comprehensive internal transfer detection
     # 1. Check for personal name combinations in funds transfers
-    if any(name in desc_lower for name in ["jay", "desai", "j n desai"]) and ("funds transfer" in subcat_lower or "ft" in desc_lower):
+    if PERSONAL_NAME_RE.search(desc_lower) and ("funds transfer" in subcat_lower or "ft" in desc_lower):
         if "tax" in desc_lower:
             # Tax transfers between accounts (not HMRC payments)
             return {'category': 'Transfer', 'subcategory': 'Internal Transfer'}
@@ -402,148 +694,23 @@ def match_vendor(description, subcategory=None, amount=None):
             return {'category': 'Transfer', 'subcategory': 'Internal Transfer'}
     
     # 2. Check for transfers between bank accounts using account keywords
-    for bank_account_term in ["instant saver", "savings account", "isa", "current account"]:
-        if bank_account_term in desc_lower:
-            return {'category': 'Transfer', 'subcategory': 'Internal Transfer'}
+    if BANK_ACCOUNT_RE.search(desc_lower):
+        return {'category': 'Transfer', 'subcategory': 'Internal Transfer'}
     
     # Handle empty or None subcategory
     if not subcategory or subcategory == 'Other':
         # Try to infer from the description if it's a direct debit or card purchase
         if "ddr" in desc_lower or "direct debit" in desc_lower or " dd" in desc_lower:
-            subcategory = "Direct Debit"
+            subcat_lower = "direct debit"
         elif "bcc" in desc_lower or "card purchase" in desc_lower or "cpm" in desc_lower:
-            subcategory = "Card Purchase"
+            subcat_lower = "card purchase"
     
     # Check for UK bank subcategories
-    if subcategory:
-        subcat_lower = subcategory.lower().strip()
-        
-        # Counter Credit is usually income
-        if "counter credit" in subcat_lower:
-            # Specific patterns from Barclays
-            if "ramco" in desc_lower:
-                return {'category': 'Income', 'subcategory': 'Business Income'}
-                
-            if "jn desai limited" in desc_lower:
-                return {'category': 'Income', 'subcategory': 'Business Income'}
-                
-            if "astrenska" in desc_lower:
-                return {'category': 'Income', 'subcategory': 'Insurance Payout'}
-                
-            if "tax" in desc_lower or "instant saver" in desc_lower or "instant access" in desc_lower:
-                return {'category': 'Transfer', 'subcategory': 'Internal Transfer'}
-                
-            # Enhanced internal transfer detection for UK banks
-            internal_transfer_keywords = [
-                "saver", "savings", "isa", "transfer to", "transfer from", 
-                "instant access", "desai", "jay", "bank transfer"
-            ]
-            
-            if any(keyword in desc_lower for keyword in internal_transfer_keywords):
-                return {'category': 'Transfer', 'subcategory': 'Internal Transfer'}
-                
-            # Generic patterns
-            if "limited" in desc_lower or "ltd" in desc_lower or "llc" in desc_lower:
-                return {'category': 'Income', 'subcategory': 'Business Income'}
-            elif "salary" in desc_lower or "wage" in desc_lower or "payroll" in desc_lower:
-                return {'category': 'Income', 'subcategory': 'Salary/Wages'}
-            # Generic income
-            return {'category': 'Income', 'subcategory': 'Other Income'}
-        
-        # Direct Debit is usually bills
-        if "direct debit" in subcat_lower:
-            # First check for special Direct Debit patterns from Barclays
-            # BUPA is health insurance
-            if "bupa" in desc_lower:
-                return {'category': 'Healthcare', 'subcategory': 'Health Insurance'}
-                
-            # American Express is credit card payment
-            if "american express" in desc_lower or "amex" in desc_lower:
-                return {'category': 'Bills & Payments', 'subcategory': 'Credit Card'}
-                
-            # Eyecare is vision insurance/payments
-            if "eyecare" in desc_lower:
-                return {'category': 'Healthcare', 'subcategory': 'Vision'}
-                
-            # AIG Life is life insurance
-            if "aig life" in desc_lower:
-                return {'category': 'Insurance', 'subcategory': 'Life Insurance'}
-                
-            # Royal London is usually life insurance
-            if "royal london" in desc_lower:
-                return {'category': 'Insurance', 'subcategory': 'Life Insurance'}
-                
-            # Clubwise is usually gym/fitness
-            if "clubwise" in desc_lower:
-                return {'category': 'Healthcare', 'subcategory': 'Fitness'}
-                
-            # Etika is usually subscriptions
-            if "etika" in desc_lower:
-                return {'category': 'Entertainment', 'subcategory': 'Subscription Services'}
-                
-            # Look for known vendors in the description
-            for vendor, categorization in VENDOR_DATABASE.items():
-                if vendor in desc_lower:
-                    return categorization
-                    
-            # Generic bill payment
-            return {'category': 'Bills & Payments', 'subcategory': 'Direct Debit'}
-        
-        # Card Purchase is usually shopping/entertainment/dining
-        if "card purchase" in subcat_lower:
-            # Apple subscriptions
-            if "apple.com" in desc_lower:
-                return {'category': 'Entertainment', 'subcategory': 'Subscription Services'}
-                
-            # HMRC tax payments
-            if "hmrc" in desc_lower or "gov.uk" in desc_lower:
-                return {'category': 'Bills & Payments', 'subcategory': 'Tax Payments'}
-                
-            # Restaurant/Dining
-            if "mcdonalds" in desc_lower:
-                return {'category': 'Food', 'subcategory': 'Fast Food'}
-                
-            # Sainsbury's is groceries
-            if "sainsburys" in desc_lower:
-                return {'category': 'Food', 'subcategory': 'Groceries'}
-                
-        # Handle Barclays "Debit" transactions
-        if "debit" == subcat_lower:
-            # Blue rewards is a fee
-            if "blue rewards" in desc_lower:
-                return {'category': 'Bills & Payments', 'subcategory': 'Bank Fees'}
-                
-            # McDonalds is fast food
-            if "mcdonalds" in desc_lower:
-                return {'category': 'Food', 'subcategory': 'Fast Food'}
-                
-            # Sainsbury's is groceries
-            if "sainsburys" in desc_lower:
-                return {'category': 'Food', 'subcategory': 'Groceries'}
-                
-        # Handle Barclays "Funds Transfer"
-        if "funds transfer" in subcat_lower:
-            # eToro is investment platform
-            if "etoro" in desc_lower:
-                return {'category': 'Investments', 'subcategory': 'Trading Platform'}
-                
-            # Tax payments to government
-            if "hmrc" in desc_lower or "gov.uk" in desc_lower:
-                return {'category': 'Bills & Payments', 'subcategory': 'Tax Payments'}
-                
-            # Internal transfers with "tax" in the description (likely between accounts)
-            if "tax" in desc_lower:
-                return {'category': 'Transfer', 'subcategory': 'Internal Transfer'}
-                
-            # Payward/Kraken is cryptocurrency - categorized as Savings/Investments
-            if "payward" in desc_lower:
-                return {'category': 'Savings', 'subcategory': 'Investments'}
-            
-            # Handle transfers to/from self - look for common name patterns
-            if ("jay" in desc_lower or "desai" in desc_lower or
-                "transfer to" in desc_lower or "transfer from" in desc_lower or
-                "instant saver" in desc_lower or "savings account" in desc_lower):
-                return {'category': 'Transfer', 'subcategory': 'Internal Transfer'}
+    if subcat_lower:
+        for handler in subcategory_handlers(subcat_lower):
+            categorization = handler(desc_lower)
+            if categorization:
+                return categorization
     
     # Quick check for common UK transaction prefixes and special cases
     # First check for internal transfers from savings accounts
@@ -561,31 +728,28 @@ def match_vendor(description, subcategory=None, amount=None):
         
     if "refund" in desc_lower:
         # Try to determine the refund category
-        for vendor, categorization in VENDOR_DATABASE.items():
-            if re.search(r'\b' + re.escape(vendor) + r'\b', desc_lower):
-                # Return the same category but change subcategory to "Refund"
-                return {'category': categorization['category'], 'subcategory': 'Refund'}
+        categorization = find_vendor(VENDOR_WORD_SCANNER, desc_lower)
+        if categorization:
+            # Return the same category but change subcategory to "Refund"
+            return {'category': categorization['category'], 'subcategory': 'Refund'}
         # Generic refund
         return {'category': 'Income', 'subcategory': 'Refund'}
     
     # Check for pay sources
-    pay_keywords = ["pay", "payroll", "salary", "wage", "income", "direct deposit"]
-    if any(keyword in desc_lower for keyword in pay_keywords):
+    if PAY_RE.search(desc_lower):
         return {'category': 'Income', 'subcategory': 'Salary/Wages'}
     
-    # Try direct matches first (most specific)
-    for vendor, categorization in VENDOR_DATABASE.items():
-        # Check if the vendor name appears as a whole word in the description
-        if re.search(r'\b' + re.escape(vendor) + r'\b', desc_lower):
-            return categorization
+    # Try direct matches first (most specific), where the vendor name appears as a
+    # whole word in the description
+    categorization = find_vendor(VENDOR_WORD_SCANNER, desc_lower)
+    if categorization:
+        return categorization
     
-    # Try contains matches (not strict word boundary)
-    for vendor, categorization in VENDOR_DATABASE.items():
-        # Skip single-word vendors to avoid false positives
-        if ' ' in vendor:
-            # For multi-word vendors, we can be less strict
-            if vendor in desc_lower:
-                return categorization
+    # Try contains matches (not strict word boundary), only for multi-word vendors
+    # to avoid false positives
+    categorization = find_vendor(MULTI_WORD_VENDOR_SCANNER, desc_lower)
+    if categorization:
+        return categorization
     
     # If no direct match, try partial matches by breaking down the description
     desc_words = set(desc_lower.split())
@@ -593,30 +757,54 @@ def match_vendor(description, subcategory=None, amount=None):
     best_score = 0
     best_vendor_length = 0  # Prefer longer vendor names when ties occur
     
-    for vendor, categorization in VENDOR_DATABASE.items():
-        vendor_words = set(vendor.split())
+    # Only vendors sharing a word with the description can reach the required overlap;
+    # visit them in database order so ties still go to the earlier vendor
+    candidates = sorted(set().union(*(VENDOR_WORD_INDEX.get(word, ()) for word in desc_words)))
+    for i in candidates:
+        vendor_words, required_overlap, vendor_length, categorization = VENDOR_WORDS[i]
         
         # Calculate overlap between vendor words and description words
         overlap = len(vendor_words.intersection(desc_words))
         
-        # Calculate match quality
-        # For multi-word vendors, we need higher overlap
-        required_overlap = 1
-        if len(vendor_words) > 2:
-            required_overlap = 2
-        
         # For a better match:
         # 1. We need more overlapping words than our previous best
         # 2. OR same overlap but the vendor name is longer (more specific)
         # 3. AND we meet the minimum required overlap
-        if (overlap > best_score or (overlap == best_score and len(vendor) > best_vendor_length)) and overlap >= required_overlap:
+        if (overlap > best_score or (overlap == best_score and vendor_length > best_vendor_length)) and overlap >= required_overlap:
             best_score = overlap
             best_match = categorization
-            best_vendor_length = len(vendor)
+            best_vendor_length = vendor_length
     
     # Return the best match if we found one with sufficient overlap
     if best_score > 0:
         return best_match
         
     # No match found
-    return None
\ No newline at end of file
+    return None
+
+def match_vendors(descriptions, subcategories=None):
+    """
+    Match a batch of transaction descriptions to known vendors in the database.
+    
+    Each distinct (description, subcategory) pair is matched once, through the cache
+    shared with match_vendor.
+    
+    Args:
+        descriptions: Sequence of transaction description strings
+        subcategories: Optional sequence of subcategories from transaction data, one per description
+        
+    Returns:
+        Tuple of NumPy object arrays with the matched category and subcategory for each
+        description, None where no vendor matched
+    """
+    if subcategories is None:
+        subcategories = [None] * len(descriptions)
+    
+    categories = np.full(len(descriptions), None, dtype=object)
+    matched_subcategories = np.full(len(descriptions), None, dtype=object)
+    for i, (description, subcategory) in enumerate(zip(descriptions, subcategories)):
+        match = cached_vendor_match(description, subcategory)
+        if match:
+            categories[i], matched_subcategories[i] = match
+    
+    return categories, matched_subcategories
@@ -13,9 +13,10 @@ def plot_income_vs_expense(df):
     Returns:
         Plotly figure object
     """
-    # Extract income and expenses
-    income = df[df['amount'] > 0]['amount'].sum()
-    expenses = abs(df[df['amount'] < 0]['amount'].sum())
+    # Extract income and expenses from the amount array, without building filtered frames
+    amounts = df['amount'].to_numpy()
+    income = amounts[amounts > 0].sum()
+    expenses = abs(amounts[amounts < 0].sum())
     
     # Create data for the chart
     categories = ['Income', 'Expenses']
@@ -54,11 +55,11 @@ def plot_expense_categories(df):
     Returns:
         Plotly figure object
     """
-    # Filter for expenses only and group by category
-    expenses = df[df['amount'] < 0].copy()
-    expenses['amount'] = expenses['amount'].abs()  # Convert to positive for visualization
+    # Filter for expenses only and group by category, selecting just the columns needed
+    expenses = df.loc[df['amount'] < 0, ['category', 'amount']]
     
-    category_expenses = expenses.groupby('category')['amount'].sum().reset_index()
+    # Convert to positive for visualization
+    category_expenses = expenses['amount'].abs().groupby(expenses['category'], observed=True).sum().reset_index()
     
     # Sort by amount descending
     category_expenses = category_expenses.sort_values('amount', ascending=False)
@@ -94,18 +95,20 @@ def plot_monthly_trend(df):
     Returns:
         Plotly figure object
     """
-    # Add month column
-    df_monthly = df.copy()
-    df_monthly['month'] = df_monthly['date'].dt.to_period('M')
+    # Month of each transaction, used as the grouping key without copying the DataFrame
+    month = df['date'].dt.to_period('M').rename('month')
+    
+    # Split amounts into income and expense columns so each month is summed in one aggregation
+    amounts = df['amount']
+    monthly_amounts = pd.DataFrame({
+        'income': amounts.where(amounts > 0, 0.0),
+        'expenses': amounts.where(amounts < 0, 0.0),
+        'net': amounts
+    })
     
     # Group by month and calculate income, expenses, and net
-    monthly_summary = df_monthly.groupby('month').apply(
-        lambda x: pd.Series({
-            'income': x[x['amount'] > 0]['amount'].sum(),
-            'expenses': abs(x[x['amount'] < 0]['amount'].sum()),
-            'net': x['amount'].sum()
-        })
-    ).reset_index()
+    monthly_summary = monthly_amounts.groupby(month).sum().reset_index()
+    monthly_summary['expenses'] = monthly_summary['expenses'].abs()
     
     # Convert Period to datetime for plotting
     monthly_summary['month'] = monthly_summary['month'].dt.to_timestamp()